@@ -0,0 +1,294 @@
+'''
+ODB persistence of O object graphs built from the narrative schemas:
+Timeline → Thread → Voice / Beat, and Scene → Situation → Character → Voice
+on top of a timeline for the deeper shape.
+'''
+import time
+
+from sqlalchemy import event
+
+from .harness import summarize
+
+SHAPES = {
+	# name          : (kind,       threads, beats)
+	'timeline_2x5'  : ('timeline', 2,       5),
+	'timeline_5x20' : ('timeline', 5,       20),
+	'timeline_10x50': ('timeline', 10,      50),
+	'scene_3x10'    : ('scene',    3,       10)
+}
+
+
+class QueryCounter:
+	'''Counts SQL statements sent to the engine while active.'''
+
+	def __init__(self, engine):
+		self.engine = engine
+		self.count  = 0
+
+	def _on_execute(self, *args):
+		self.count += 1
+
+	def __enter__(self):
+		self.count = 0
+		event.listen(self.engine, 'before_cursor_execute', self._on_execute)
+		return self
+
+	def __exit__(self, *exc):
+		event.remove(self.engine, 'before_cursor_execute', self._on_execute)
+
+
+class PlanRecorder(QueryCounter):
+	'''Collects the statements touching the edges table and explains them.'''
+
+	def __init__(self, engine):
+		super().__init__(engine)
+		self.statements = []
+
+	def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+		super()._on_execute()
+		if 'edges' in statement and not executemany and not statement.lstrip().upper().startswith('INSERT'):
+			self.statements.append((statement, parameters))
+
+	def __enter__(self):
+		self.statements = []
+		return super().__enter__()
+
+	def explain(self) -> list[list[str]]:
+		with self.engine.connect() as conn:
+			return [
+				[row[-1] for row in conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters)]
+				for statement, parameters in self.statements
+			]
+
+
+# Graphs
+############################################################################
+
+def build_voice(schemas, name: str):
+	return schemas.VoiceSchema(name=name, tone='calm', style='plain', intent='inform')
+
+def build_timeline(schemas, threads: int, beats: int):
+	return schemas.TimelineSchema(
+		title   = 'Timeline',
+		threads = [
+			schemas.ThreadSchema(
+				voice = build_voice(schemas, f'voice {t}'),
+				beats = [schemas.BeatSchema(timestamp=b, text=f'beat {t}.{b}') for b in range(beats)]
+			)
+			for t in range(threads)
+		]
+	)
+
+def build_situation(schemas, characters: int):
+	return schemas.SituationSchema(
+		time       = 'morning',
+		location   = 'harbour',
+		condition  = 'fog',
+		characters = [
+			schemas.CharacterSchema(name=f'character {c}', voices=[build_voice(schemas, f'voice {c}.{v}') for v in range(2)])
+			for c in range(characters)
+		]
+	)
+
+def build(schemas, kind: str, threads: int, beats: int):
+	if kind == 'scene':
+		return schemas.SceneSchema(
+			title    = 'Scene',
+			start    = build_situation(schemas, threads),
+			end      = build_situation(schemas, threads),
+			timeline = build_timeline(schemas, threads, beats)
+		)
+	return build_timeline(schemas, threads, beats)
+
+def walk(o, seen: dict = None) -> dict:
+	'''All O instances reachable from `o`, keyed by (type, id).'''
+	seen = {} if seen is None else seen
+	key  = (type(o).__name__, o.id)
+	if key in seen:
+		return seen
+	seen[key] = o
+
+	for name in o.model_fields:
+		value = o.__dict__.get(name)
+		items = value if isinstance(value, list) else value.values() if isinstance(value, dict) else [value]
+		for item in items:
+			if hasattr(item, 'db'):
+				walk(item, seen)
+	return seen
+
+
+# Measurements
+############################################################################
+
+def measure(counter: QueryCounter, fn) -> tuple:
+	with counter:
+		started = time.perf_counter()
+		result  = fn()
+		elapsed = time.perf_counter() - started
+	return result, elapsed, counter.count
+
+def forget(ODB, session):
+	'''Drops the ODB identity map and the session state so the next load hits the DB.'''
+	ODB.clear()
+	session.expunge_all()
+
+def bench_shape(schemas, ODB, session, counter, kind: str, threads: int, beats: int, iterations: int) -> dict:
+	from wordwield.db import EdgeRecord
+
+	timings = {op: [] for op in ('save', 'load_cold', 'load_warm', 'get_related', 'delete')}
+	queries = {op: 0  for op in timings}
+	objects = edges = 0
+
+	for _ in range(iterations):
+		root = build(schemas, kind, threads, beats)
+		edges_before = session.query(EdgeRecord).count()
+
+		_, elapsed, count = measure(counter, root.save)
+		timings['save'].append(elapsed)
+		queries['save'] += count
+		edges = session.query(EdgeRecord).count() - edges_before
+
+		forget(ODB, session)
+		loaded, elapsed, count = measure(counter, lambda: type(root).load(root.id))
+		timings['load_cold'].append(elapsed)
+		queries['load_cold'] += count
+
+		_, elapsed, count = measure(counter, lambda: type(root).load(root.id))
+		timings['load_warm'].append(elapsed)
+		queries['load_warm'] += count
+
+		relation = 'timeline' if kind == 'scene' else 'threads'
+		_, elapsed, count = measure(counter, lambda: loaded.db.get_related(relation))
+		timings['get_related'].append(elapsed)
+		queries['get_related'] += count
+
+		nodes   = list(walk(loaded).values())
+		objects = len(nodes)
+		_, elapsed, count = measure(counter, lambda: [node.delete() for node in nodes])
+		timings['delete'].append(elapsed)
+		queries['delete'] += count
+
+		forget(ODB, session)
+
+	return {
+		'objects' : objects,
+		'edges'   : edges,
+		**{
+			op: summarize(samples, queries=queries[op] / iterations)
+			for op, samples in timings.items()
+		}
+	}
+
+
+def check_plans(schemas, ODB, session, engine) -> dict:
+	'''
+	Query plans of every edge lookup on the save / load / delete paths. A plan
+	scanning the whole edges table instead of searching an index is reported
+	as not indexed and fails the run (see `failures`).
+	'''
+	recorder = PlanRecorder(engine)
+	root     = build(schemas, 'scene', 2, 3)
+	o_class  = type(root)
+	steps    = {
+		'save'         : lambda: root.save('plan_check'),
+		'resave'       : lambda: root.save(),
+		'load_cold'    : lambda: (forget(ODB, session), o_class.load(root.id)),
+		'load_by_name' : lambda: o_class.load('plan_check'),
+		'get_related'  : lambda: root.db.get_related('timeline'),
+		'get_name'     : lambda: root.db.get_name(),
+		'delete'       : lambda: [node.delete() for node in walk(root).values()]
+	}
+
+	result = {}
+	for step, fn in steps.items():
+		with recorder:
+			fn()
+		plans   = recorder.explain()
+		scans   = sorted({line for plan in plans for line in plan if line.startswith('SCAN edges')})
+		indexed = not scans
+		result[step] = {
+			'statements' : len(plans),
+			'indexed'    : indexed,
+			'scans'      : scans,
+			'plans'      : sorted({line for plan in plans for line in plan if 'edges' in line})
+		}
+
+	forget(ODB, session)
+	return result
+
+
+def check_reverse(ODB, session) -> dict:
+	'''
+	Saves through both ends of a reverse relation: a kid loaded through its
+	parent edges and saved must reuse those edges, not add forward copies.
+	'''
+	from wordwield.lib.o import O
+
+	class BenchKid(O):
+		name   : str
+		parent : 'BenchParent' = O.Field(reverse='kids')
+
+	class BenchParent(O):
+		name : str
+		kids : list[BenchKid] = O.Field(reverse='parent')
+
+	BenchKid.model_rebuild()
+
+	def kid(name: str):
+		o        = BenchKid.model_construct(name=name)  # Parent left unset: filled from the edges once saved
+		o.__db__ = ODB(o)
+		return o
+
+	parent = BenchParent(name='parent', kids=[kid('a'), kid('b')]).save()
+	both   = BenchParent(name='both', kids=[kid('c')])
+	both.kids[0].parent = both
+	both.save()
+
+	forget(ODB, session)
+	BenchKid.load(parent.kids[0].id).save()
+	forget(ODB, session)
+
+	result = {
+		'kids'      : [o.name for o in BenchParent.load(parent.id).kids],
+		'both_kids' : [o.name for o in BenchParent.load(both.id).kids],
+		'expected'  : {'kids': ['a', 'b'], 'both_kids': ['c']}
+	}
+	result['ok'] = result['kids'] == ['a', 'b'] and result['both_kids'] == ['c']
+
+	for o in [parent, both, *parent.kids, *both.kids]:
+		o.delete()
+	forget(ODB, session)
+	return result
+
+
+def failures(result: dict) -> list[str]:
+	'''Checks of an `odb` suite result that failed: table scans in edge lookups, duplicated reverse edges.'''
+	messages = [
+		f'ODB {step}: edge lookup scans the table: {plan["scans"]}'
+		for step, plan in result.get('plans', {}).items()
+		if not plan['indexed']
+	]
+	reverse = result.get('reverse')
+	if reverse and not reverse['ok']:
+		messages.append(f'ODB reverse: related objects {reverse["kids"]}, {reverse["both_kids"]}, expected {reverse["expected"]}')
+	return messages
+
+
+async def run(client, iterations: int = 200) -> dict:
+	from wordwield.db      import engine, session
+	from wordwield.lib.odb import ODB
+	from projects.narrative import schemas
+
+	counter = QueryCounter(engine)
+	rounds  = max(iterations // 20, 3)
+
+	result = {
+		'plans'   : check_plans(schemas, ODB, session, engine),
+		'reverse' : check_reverse(ODB, session),
+		**{
+			name: bench_shape(schemas, ODB, session, counter, kind, threads, beats, rounds)
+			for name, (kind, threads, beats) in SHAPES.items()
+		}
+	}
+	result['identity'] = ODB.stats()  # Cumulative over all shapes
+	return result
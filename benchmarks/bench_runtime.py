@@ -0,0 +1,304 @@
+'''
+Operator invocation path: HTTP handler → RuntimeService.invoke → Python.invoke,
+measured in-process through the ASGI app. Model calls go to the `mock::` provider
+with a fixed latency: through the response cache, single-flight and the batcher,
+and from the plugin Recursor operator.
+'''
+import time, asyncio
+
+from .harness import summarize, sample
+
+INT  = {'type': 'integer'}
+STR  = {'type': 'string'}
+MOCK = 'mock::echo?latency=0.005'  # Every case below adds its own option so each gets its own model instance
+
+OPERATORS = {
+	'bench_times_two': ({'x': INT}, {'y': INT}, '''
+class BenchTimesTwo(Operator):
+	class InputType(O):
+		x: int
+	class OutputType(O):
+		y: int
+	async def invoke(self, x):
+		return x * 2
+'''),
+	'bench_chain': ({'depth': INT}, {'depth': INT}, '''
+class BenchChain(Operator):
+	class InputType(O):
+		depth: int
+	class OutputType(O):
+		depth: int
+	async def invoke(self, depth):
+		if depth <= 0:
+			return 0
+		return await bench_chain(depth - 1) + 1
+'''),
+	'bench_tree': ({'depth': INT, 'spread': INT, 'parallel': {'type': 'boolean'}}, {'nodes': INT}, '''
+class BenchTree(Operator):
+	class InputType(O):
+		depth    : int
+		spread   : int
+		parallel : bool
+	class OutputType(O):
+		nodes: int
+	async def invoke(self, depth, spread, parallel):
+		if depth <= 0:
+			return 1
+		if parallel:
+			counts = await call_many([('bench_tree', depth - 1, spread, True) for _ in range(spread)])
+		else:
+			counts = [await bench_tree(depth - 1, spread, False) for _ in range(spread)]
+		return 1 + sum(counts)
+'''),
+	'bench_ask': ({'prompt': STR, 'model_id': STR}, {'answer': STR}, '''
+class BenchAsk(Operator):
+	class InputType(O):
+		prompt   : str
+		model_id : str
+	class OutputType(O):
+		answer: str
+	async def invoke(self, prompt, model_id):
+		return await ask(prompt, self.OutputType, model_id=model_id)
+'''),
+	'bench_generator': ({'item': STR, 'spread': INT, 'breadcrumbs': {'type': 'array', 'items': STR}, 'model_id': STR}, {'items': {'type': 'array', 'items': STR}}, '''
+class BenchGenerator(Operator):
+	class InputType(O):
+		item        : str
+		spread      : int
+		breadcrumbs : list[str]
+		model_id    : str
+	class OutputType(O):
+		items: list[str]
+	async def invoke(self, item, spread, breadcrumbs, model_id):
+		await ask(' / '.join(breadcrumbs + [item]), self.OutputType, model_id=model_id)
+		return [f'{item}.{i}' for i in range(spread)]  # Mock answers repeat the prompt, so children are numbered
+''')
+}
+
+
+async def create_operator(client, name: str, input_fields: dict, output_fields: dict, code: str):
+	class_name = ''.join(part.title() for part in name.split('_'))
+	response   = await client.post('/wordwield/create_operator', json={
+		'name'        : name,
+		'class_name'  : class_name,
+		'input_type'  : {'properties': input_fields, 'required': list(input_fields)},
+		'output_type' : {'properties': output_fields},
+		'code'        : code.strip() + '\n'
+	})
+	response.raise_for_status()
+
+
+async def invoke(client, name: str, **input):
+	response = await client.post(f'/wordwield/{name}', json=input)
+	response.raise_for_status()
+	return response.json()['output']
+
+
+# Benchmarks
+############################################################################
+
+async def bench_per_call(client, iterations: int) -> dict:
+	'''Round trip of a trivial operator.'''
+	samples = await sample(lambda: invoke(client, 'bench_times_two', x=3), iterations, warmup=10)
+	return summarize(samples, ops_per_s=len(samples) / sum(samples))
+
+
+async def bench_nested(client, iterations: int, depth: int = 10) -> dict:
+	'''Cost of one nested operator call: chain of `depth` calls minus the outer call.'''
+	flat, chained = [], []
+	for _ in range(iterations):  # Interleaved so drift affects both sides alike
+		flat    += await sample(lambda: invoke(client, 'bench_chain', depth=0),     1, warmup=1)
+		chained += await sample(lambda: invoke(client, 'bench_chain', depth=depth), 1, warmup=1)
+
+	base     = sum(flat) / len(flat)
+	per_call = [(duration - base) / depth for duration in chained]
+	return summarize(per_call, depth=depth, outer_ms=base * 1000)
+
+
+async def bench_tree(client, iterations: int, depth: int = 3, spread: int = 4) -> dict:
+	'''Recursive fan-out, sequential and through call_many.'''
+	result = {}
+	for parallel in (False, True):
+		samples = await sample(
+			lambda: invoke(client, 'bench_tree', depth=depth, spread=spread, parallel=parallel),
+			max(iterations // 10, 3),
+			warmup = 1
+		)
+		nodes = sum(spread ** level for level in range(depth + 1))
+		result['parallel' if parallel else 'sequential'] = summarize(samples, nodes=nodes, per_node_ms=sum(samples) / len(samples) / nodes * 1000)
+	return result
+
+
+async def bench_type_loading(client, iterations: int, count: int = 10) -> dict:
+	'''
+	Creating a chain of dependent types, then invoking an operator that uses the
+	last one: cold after the base type changes, and warm.
+	'''
+	create = []
+	for i in range(count):
+		body     = '\tx: int\n' if i == 0 else f'\tprev: BenchType{i - 1}\n'
+		started  = time.perf_counter()
+		response = await client.post('/wordwield/create_type', json={'name': f'BenchType{i}', 'code': f'class BenchType{i}(O):\n{body}'})
+		response.raise_for_status()
+		create.append(time.perf_counter() - started)
+
+	await create_operator(client, 'bench_typed', {'x': INT}, {'y': INT}, f'''
+class BenchTyped(Operator):
+	class InputType(O):
+		x: int
+	class OutputType(O):
+		y: int
+	async def invoke(self, x):
+		return x if BenchType{count - 1} else 0
+''')
+
+	cold = []
+	for i in range(max(iterations // 10, 3)):
+		response = await client.post('/wordwield/create_type', json={'name': 'BenchType0', 'code': f'class BenchType0(O):\n\tx: int = {i}\n'})
+		response.raise_for_status()
+		started = time.perf_counter()
+		await invoke(client, 'bench_typed', x=1)
+		cold.append(time.perf_counter() - started)
+
+	warm = await sample(lambda: invoke(client, 'bench_typed', x=1), iterations, warmup=3)
+
+	return {
+		'types'       : count,
+		'create_type' : summarize(create),
+		'cold_invoke' : summarize(cold),
+		'warm_invoke' : summarize(warm)
+	}
+
+
+async def bench_concurrent(client, iterations: int, clients: tuple = (1, 8, 32)) -> dict:
+	'''Throughput of the trivial operator with N concurrent clients.'''
+	result = {}
+	for count in clients:
+		per_client = max(iterations // count, 1)
+
+		async def run_client():
+			return await sample(lambda: invoke(client, 'bench_times_two', x=3), per_client)
+
+		started = time.perf_counter()
+		samples = sum(await asyncio.gather(*(run_client() for _ in range(count))), [])
+		elapsed = time.perf_counter() - started
+
+		result[f'clients_{count}'] = summarize(samples, ops_per_s=len(samples) / elapsed)
+	return result
+
+
+def get_mock(model_id: str):
+	from wordwield.lib import Model
+	return Model.load(model_id)
+
+
+async def bench_ask_cache(client, iterations: int) -> dict:
+	'''ask() from an operator: a new prompt every call (cache miss), then one prompt over and over (cache hit).'''
+	model_id = f'{MOCK}&case=cache'
+	count    = iter(range(iterations * 2))
+
+	miss = await sample(lambda: invoke(client, 'bench_ask', prompt=f'miss {next(count)}', model_id=model_id), iterations)
+	hit  = await sample(lambda: invoke(client, 'bench_ask', prompt='hit', model_id=model_id), iterations, warmup=1)
+	return {
+		'miss' : summarize(miss),
+		'hit'  : summarize(hit)
+	}
+
+
+async def bench_single_flight(client, iterations: int, clients: int = 16) -> dict:
+	'''`clients` identical asks at once, a new prompt per round: single-flight sends one request for all of them.'''
+	from wordwield.lib import Model
+
+	model_id  = f'{MOCK}&case=single_flight'
+	mock      = get_mock(model_id)
+	rounds    = max(iterations // 10, 3)
+	calls     = mock.calls
+	coalesced = Model.coalesced
+
+	samples = []
+	for i in range(rounds):
+		started = time.perf_counter()
+		await asyncio.gather(*(invoke(client, 'bench_ask', prompt=f'same {i}', model_id=model_id) for _ in range(clients)))
+		samples.append(time.perf_counter() - started)
+
+	return summarize(
+		samples,
+		clients    = clients,
+		requests   = rounds * clients,
+		dispatched = mock.calls - calls,
+		coalesced  = Model.coalesced - coalesced
+	)
+
+
+async def bench_batching(client, iterations: int, clients: int = 32, size: int = 8) -> dict:
+	'''`clients` different asks at once through a batcher of `size`.'''
+	from wordwield.lib import Model
+
+	model_id        = f'{MOCK}&case=batching'
+	mock            = get_mock(model_id)
+	mock.batch_size = size
+	rounds          = max(iterations // 10, 3)
+	count           = iter(range(rounds * clients))
+
+	samples = []
+	started = time.perf_counter()
+	for _ in range(rounds):
+		round_started = time.perf_counter()
+		await asyncio.gather(*(invoke(client, 'bench_ask', prompt=f'batched {next(count)}', model_id=model_id) for _ in range(clients)))
+		samples.append(time.perf_counter() - round_started)
+	elapsed = time.perf_counter() - started
+
+	batcher = Model.batch_stats()[model_id]
+	return summarize(
+		samples,
+		clients   = clients,
+		ops_per_s = rounds * clients / elapsed,
+		batches   = batcher['batches'],
+		fill      = batcher['fill']
+	)
+
+
+async def bench_recursor(client, iterations: int, depth: int = 3, spread: int = 3) -> dict:
+	'''The plugin Recursor operator over a generator that asks the mock model, sequential and through call_many.'''
+	result = {}
+	count  = iter(range(iterations * 2))
+	nodes  = sum(spread ** level for level in range(depth))  # Nodes that call the generator
+
+	for parallel in (False, True):
+		model_id = f'{MOCK}&case=recursor_{"parallel" if parallel else "sequential"}'
+		mock     = get_mock(model_id)
+		calls    = mock.calls
+		samples  = await sample(
+			lambda: invoke(
+				client, 'recursor',
+				generator_name  = 'bench_generator',
+				generator_input = {'item': f'root {next(count)}', 'model_id': model_id},  # New root: no cache hits
+				depth           = depth,
+				spread          = spread,
+				parallel        = parallel
+			),
+			max(iterations // 20, 3)
+		)
+		result['parallel' if parallel else 'sequential'] = summarize(
+			samples,
+			asks_per_run = (mock.calls - calls) / len(samples),
+			expected     = nodes
+		)
+	return result
+
+
+async def run(client, iterations: int = 200) -> dict:
+	for name, (input_fields, output_fields, code) in OPERATORS.items():
+		await create_operator(client, name, input_fields, output_fields, code)
+
+	return {
+		'per_call'      : await bench_per_call(client, iterations),
+		'nested'        : await bench_nested(client, iterations),
+		'tree'          : await bench_tree(client, iterations),
+		'type_loading'  : await bench_type_loading(client, iterations),
+		'concurrent'    : await bench_concurrent(client, iterations),
+		'ask_cache'     : await bench_ask_cache(client, iterations),
+		'single_flight' : await bench_single_flight(client, iterations),
+		'batching'      : await bench_batching(client, iterations),
+		'recursor'      : await bench_recursor(client, iterations)
+	}
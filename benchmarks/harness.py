@@ -0,0 +1,101 @@
+import os, sys, time, tempfile, contextlib, subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup_environment(workdir: str = None) -> str:
+	'''
+	Points the app at a fresh SQLite DB in a temporary directory. Must run
+	before anything from `wordwield` is imported: db.py opens the DB on import.
+	'''
+	workdir = workdir or tempfile.mkdtemp(prefix='wordwield_bench_')
+
+	os.environ['DB_NAME']         = 'bench'
+	os.environ['METRICS_ENABLED'] = os.environ.get('METRICS_ENABLED', '0')
+	os.environ.setdefault('PROJECT_PATH', ROOT)
+	os.environ.setdefault('MODELS_DIR',   'wordwield/models')
+	os.environ.setdefault('OPERATOR_DIR', 'wordwield/operators')
+	os.environ.setdefault('LOG_DIR',      os.path.join(workdir, 'logs'))
+	os.environ.setdefault('DATA_DIR',     os.path.join(workdir, 'data'))
+	os.environ.setdefault('DAPI_URL',     'http://localhost:8000')
+	os.environ.setdefault('MODEL_CACHE',  'memory')  # So the ask() cases go through the response cache
+
+	for path in (ROOT, os.path.join(ROOT, 'wordwield')):
+		if path not in sys.path:
+			sys.path.insert(0, path)
+
+	os.chdir(workdir)  # DB_URL is relative to the working directory
+	return workdir
+
+
+def alias_lib():
+	'''
+	Points the top-level `lib` package used by plugins (`from lib import Model`,
+	`from lib.operator import Operator`) at the already imported `wordwield.lib`.
+	Importing `wordwield` loads the client `WordWield`, which sets CLIENT, so a
+	plain `import lib` would run the client branch of a second copy of the
+	package: its Model and Operator are not the classes the app discovers
+	providers and plugin operators by. Call after importing the app.
+	'''
+	import wordwield.lib
+
+	for name, module in list(sys.modules.items()):
+		if name == 'wordwield.lib' or name.startswith('wordwield.lib.'):
+			sys.modules[name[len('wordwield.'):]] = module
+
+
+def get_revision() -> str | None:
+	try:
+		return subprocess.check_output(
+			['git', 'rev-parse', '--short', 'HEAD'],
+			cwd    = ROOT,
+			stderr = subprocess.DEVNULL,
+			text   = True
+		).strip()
+	except (OSError, subprocess.CalledProcessError):
+		return None
+
+
+@contextlib.contextmanager
+def quiet(enabled: bool = True):
+	'''Silences console trace output while measuring. It is still produced, so its cost is counted.'''
+	if not enabled:
+		yield
+		return
+	with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+		yield
+
+
+# Timing
+############################################################################
+
+def summarize(samples: list[float], **extra) -> dict:
+	'''Latency summary in milliseconds for per-operation samples in seconds.'''
+	ordered = sorted(samples)
+	count   = len(ordered)
+
+	def percentile(p):
+		return ordered[min(int(p * count), count - 1)] * 1000
+
+	return {
+		'count'   : count,
+		'mean_ms' : sum(ordered) / count * 1000,
+		'p50_ms'  : percentile(0.50),
+		'p95_ms'  : percentile(0.95),
+		'min_ms'  : ordered[0]  * 1000,
+		'max_ms'  : ordered[-1] * 1000,
+		**extra
+	}
+
+
+async def sample(fn, iterations: int, warmup: int = 0) -> list[float]:
+	'''Awaits `fn()` `warmup` times untimed, then `iterations` times, returning each duration.'''
+	for _ in range(warmup):
+		await fn()
+
+	samples = []
+	for _ in range(iterations):
+		started = time.perf_counter()
+		await fn()
+		samples.append(time.perf_counter() - started)
+	return samples
@@ -0,0 +1,99 @@
+'''
+Standalone benchmark runner. Starts the app in-process against a temporary
+SQLite DB, runs the selected suites and prints JSON results. Exits with 1
+when a check fails, e.g. an ODB edge lookup that scans the table.
+
+	python -m benchmarks.run [--suite runtime|odb] [--iterations 200] [--output results.json] [--compare baseline.json]
+'''
+import os, sys, json, asyncio, argparse, platform, datetime
+
+from .harness import setup_environment, alias_lib, get_revision, quiet
+
+SUITES = ('runtime', 'odb')
+
+
+async def run_suites(suites: list[str], iterations: int, verbose: bool) -> dict:
+	import httpx
+
+	with quiet(not verbose):  # Importing the app prints its startup banner
+		import wordwield.app as app_module
+		from . import bench_runtime, bench_odb
+	alias_lib()  # Before plugin operators and model providers load
+
+	modules = {
+		'runtime' : bench_runtime,
+		'odb'     : bench_odb
+	}
+
+	results   = {}
+	transport = httpx.ASGITransport(app=app_module.app)
+
+	with quiet(not verbose):
+		await app_module.dapi.initialize_services()
+
+		async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+			for suite in suites:
+				results[suite] = await modules[suite].run(client, iterations)
+
+	return results
+
+
+def compare(current: dict, baseline: dict, path: str = '') -> list[str]:
+	'''Lines with the relative change of every latency, throughput and query count figure.'''
+	lines = []
+	for key, value in current.items():
+		name  = f'{path}.{key}' if path else key
+		other = baseline.get(key) if isinstance(baseline, dict) else None
+
+		if isinstance(value, dict):
+			lines += compare(value, other or {}, name)
+		elif key in ('mean_ms', 'p95_ms', 'ops_per_s', 'queries') and isinstance(other, (int, float)) and other:
+			change = (value - other) / other * 100
+			lines.append(f'{name:<60} {other:>12.3f} → {value:>12.3f}  {change:+7.1f}%')
+	return lines
+
+
+def main(argv: list[str] = None):
+	parser = argparse.ArgumentParser(description='WordWield benchmarks')
+	parser.add_argument('--suite',      action='append', choices=SUITES, help='Suite to run, repeatable (default: all)')
+	parser.add_argument('--iterations', type=int, default=200, help='Samples per measurement')
+	parser.add_argument('--output',     help='Write JSON results to this file')
+	parser.add_argument('--compare',    help='Baseline JSON from an earlier run to diff against')
+	parser.add_argument('--verbose',    action='store_true', help='Keep console trace output')
+	args = parser.parse_args(argv)
+
+	output   = args.output  and os.path.abspath(args.output)   # Resolved before leaving the current directory
+	baseline = args.compare and os.path.abspath(args.compare)
+
+	workdir = setup_environment()
+	results = asyncio.run(run_suites(args.suite or list(SUITES), args.iterations, args.verbose))
+	report  = {
+		'revision'   : get_revision(),
+		'timestamp'  : datetime.datetime.now(datetime.timezone.utc).isoformat(),
+		'python'     : platform.python_version(),
+		'platform'   : platform.platform(),
+		'iterations' : args.iterations,
+		'workdir'    : workdir,
+		'results'    : results
+	}
+
+	text = json.dumps(report, indent=2)
+	if output:
+		with open(output, 'w') as f:
+			f.write(text)
+	print(text)
+
+	if baseline:
+		with open(baseline) as f:
+			previous = json.load(f)
+		print('\n'.join(compare(results, previous.get('results', {}))), file=sys.stderr)
+
+	from .bench_odb import failures
+	failed = failures(results.get('odb', {}))
+	if failed:
+		print('\n'.join(failed), file=sys.stderr)
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main()
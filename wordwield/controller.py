@@ -1,6 +1,9 @@
-from fastapi.responses import PlainTextResponse
+import json
+import asyncio
+from fastapi           import Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
 
-from wordwield.lib              import Dapi, ExecutionContext
+from wordwield.lib       import Dapi, ExecutionContext, DapiException, Model
 from wordwield.services  import DefinitionService, RuntimeService, TypeService
 from wordwield.schemas   import (
 	NameSchema,
@@ -55,12 +58,58 @@ async def reset_operators(input: EmptySchema):
 	await dapi.definition_service.delete_all()
 	return { 'status' : 'success' }
 
+# METRICS
+############################################################################
+
+@dapi.router.get('/metrics')
+async def get_metrics(format: str = 'prometheus'):
+	if format == 'json':
+		return {
+			'operators' : dapi.metrics.to_dict(),
+			'batches'   : Model.batch_stats(),
+			'identity'  : dapi.odb.objects.to_dict()
+		}
+	return PlainTextResponse(dapi.metrics.to_prometheus() + Model.batch_prometheus() + dapi.odb.objects.to_prometheus(), media_type='text/plain; version=0.0.4')
+
 # RUNTIME invoke
 ############################################################################
 
+@dapi.router.post('/stream/{operator_name}',           include_in_schema=False)
+async def stream_operator_handler(operator_name: str, input: dict, request: Request):
+	'''Streams NDJSON events: `token` and `field` while models generate, then `output` or `error`.'''
+	queue   = asyncio.Queue()
+	context = ExecutionContext(sink=dapi.trace_sink, stream=queue)
+
+	async def run():
+		try:
+			result = await dapi.runtime_service.invoke(operator_name, input, context)
+			await queue.put({'event': 'output', 'output': result if isinstance(result, dict) else {}})
+		except Exception as e:
+			await queue.put({'event': 'error', **DapiException.consume(e).to_dict()})
+		finally:
+			dapi.metrics.collect(context.root)
+			dapi.trace_sink.flush()
+			await queue.put(None)
+
+	async def events():
+		task = asyncio.create_task(run())
+		try:
+			while (event := await queue.get()) is not None:
+				yield json.dumps(event, ensure_ascii=False, default=str) + '\n'
+				if await request.is_disconnected():
+					break
+		finally:
+			task.cancel()
+
+	return StreamingResponse(events(), media_type='application/x-ndjson')
+
 @dapi.router.post('/{operator_name}',                  include_in_schema=False)
 @dapi.router.post('/{operator_name}/{operator_name1}', include_in_schema=False)
 async def dynamic_operator_handler(operator_name: str, input: dict):
-	context = ExecutionContext()
-	result  = await dapi.runtime_service.invoke(operator_name, input, context)
+	context = ExecutionContext(sink=dapi.trace_sink)
+	try:
+		result = await dapi.runtime_service.invoke(operator_name, input, context)
+	finally:
+		dapi.metrics.collect(context.root)
+		dapi.trace_sink.flush()
 	return OutputSchema(output=result if isinstance(result, dict) else {})
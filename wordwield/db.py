@@ -4,9 +4,10 @@ from typing                         import Any, Dict
 from datetime                       import datetime, date
 
 from dotenv                         import load_dotenv
-from sqlalchemy                     import Column, Enum, Integer, String, Text, DateTime, create_engine, JSON, Boolean, UniqueConstraint
+from sqlalchemy                     import Column, Enum, Integer, Float, String, Text, DateTime, create_engine, JSON, Boolean, UniqueConstraint, Index, inspect, insert, select, update, union
 from sqlalchemy.orm                 import Mapped, mapped_column, sessionmaker
 from sqlalchemy.ext.mutable         import MutableDict
+from sqlalchemy.schema              import CreateColumn
 from sqlalchemy.dialects.postgresql import UUID
 
 from wordwield.lib.record           import Record, Base
@@ -49,10 +50,27 @@ class OperatorRecord(Record):
 	scope        : Mapped[Dict[str, Any]]  = mapped_column(MutableDict.as_mutable(JSON), default=dict,     comment='Runtime scope for function operators')
 	config       : Mapped[Dict[str, Any]]  = mapped_column(MutableDict.as_mutable(JSON), default=dict,     comment='Configuration passed to interpreter')
 
+class ModelCacheRecord(Record):
+	__tablename__ = 'model_cache'
+
+	key          : Mapped[str]             = mapped_column(String(64),                   primary_key=True, comment='sha256 of the normalized model request')
+	model_id     : Mapped[str]             = mapped_column(String(255),                  nullable=False,   comment='Model id as `provider::name`')
+	response     : Mapped[Dict[str, Any]]  = mapped_column(JSON,                         nullable=False,   comment='Decoded model response')
+	created      : Mapped[float]           = mapped_column(Float,                        nullable=False,   comment='Unix time of caching')
+	expires      : Mapped[float]           = mapped_column(Float,                        nullable=True,    comment='Unix time of expiry, null for never')
+
+class EdgeTypeRecord(Record):
+	__tablename__ = 'edge_types'
+
+	id           : Mapped[int]             = mapped_column(Integer,                      primary_key=True, comment='Interned type id, starts at 1')
+	name         : Mapped[str]             = mapped_column(String(255),                  nullable=False,   unique=True, comment='Class name of an edge end')
+
 class EdgeRecord(Record):
 	__tablename__ = 'edges'
 	__table_args__ = (
-		UniqueConstraint('id1', 'id2', 'key1', 'key2', 'rel1', 'rel2'),
+		UniqueConstraint('id1', 'id2', 'tid1', 'tid2', 'key1', 'key2', 'rel1', 'rel2'),  # Type-qualified: equal ids of different types are different ends
+		Index('ix_edges_forward', 'id1', 'tid1', 'rel1', 'key1'),  # Edges from an object: Edge.get, load_by_name, saves
+		Index('ix_edges_reverse', 'id2', 'tid2', 'rel2', 'key2'),  # Edges into an object: Edge.get reverse side, delete
 	)
 
 	id      = Column(Integer, primary_key=True)	          # Unique identifier of this edge row
@@ -60,6 +78,8 @@ class EdgeRecord(Record):
 	type1   = Column(String, nullable=False)	          # Class name (string) of the source object
 	id2     = Column(Integer, nullable=False)	          # ID of the target object (the "to" side of the edge)
 	type2   = Column(String, nullable=False)	          # Class name (string) of the target object
+	tid1    = Column(Integer, nullable=False, default=0, server_default='0')  # Interned id of type1 (EdgeTypeRecord), used by lookups
+	tid2    = Column(Integer, nullable=False, default=0, server_default='0')  # Interned id of type2 (EdgeTypeRecord), used by lookups
 	rel1    = Column(String, nullable=False, default='')  # Field name (attribute) on the source object which defines this relation
 	rel2    = Column(String, nullable=False, default='')  # Field name (attribute) on the target object that is considered a reverse relation (if exists)
 	key1    = Column(String, nullable=False, default='')  # Key/index for the source (used for List/Dict: list index or dict key; empty for direct relations)
@@ -72,4 +92,76 @@ class EdgeRecord(Record):
 		key2 = f'[{self.key2}]' if self.key2 else ''
 		rel1 = f'.{self.rel1}'  if self.rel1 else ''
 		rel2 = f'.{self.rel2}'  if self.rel2 else ''
-		return f'Edge #{self.id}: {self.type1}{rel1}{key1}({self.id1}) -> {self.type2}{rel2}{key2}({self.id2})'
\ No newline at end of file
+		return f'Edge #{self.id}: {self.type1}{rel1}{key1}({self.id1}) -> {self.type2}{rel2}{key2}({self.id2})'
+
+
+def migrate(bind=engine):
+	'''
+	Brings an existing DB up to the current models. create_all() skips tables
+	that already exist, so columns and indexes added later are created here.
+	'''
+	Base.metadata.create_all(bind=bind)
+	with bind.begin() as conn:
+		_add_columns(conn)
+		_intern_edge_types(conn)
+		_rebuild_tables(conn)
+		_sync_indexes(conn)
+
+def _add_columns(conn):
+	inspector = inspect(conn)
+	for table in Base.metadata.sorted_tables:
+		present = {column['name'] for column in inspector.get_columns(table.name)}
+		for column in table.columns:
+			if column.name not in present:
+				conn.exec_driver_sql(f'ALTER TABLE {table.name} ADD COLUMN {CreateColumn(column).compile(dialect=conn.dialect)}')
+
+def _intern_edge_types(conn):
+	'''Fills tid1 / tid2 of edges written before type ids existed.'''
+	edges, types = EdgeRecord.__table__, EdgeTypeRecord.__table__
+	if conn.execute(select(edges.c.id).where((edges.c.tid1 == 0) | (edges.c.tid2 == 0)).limit(1)).first() is None:
+		return
+
+	known = select(types.c.name)
+	conn.execute(insert(types).from_select(['name'], select(union(
+		select(edges.c.type1).where(edges.c.type1.not_in(known)),
+		select(edges.c.type2).where(edges.c.type2.not_in(known))
+	).subquery())))
+
+	for tid, name in ((edges.c.tid1, edges.c.type1), (edges.c.tid2, edges.c.type2)):
+		conn.execute(update(edges).where(tid == 0).values({
+			tid: select(types.c.id).where(types.c.name == name).scalar_subquery()
+		}))
+
+def _rebuild_tables(conn):
+	'''
+	Recreates tables whose unique constraints changed, which SQLite cannot
+	alter in place: rename, create from the model, copy rows, drop the old one.
+	'''
+	inspector = inspect(conn)
+	for table in Base.metadata.sorted_tables:
+		wanted  = {frozenset(c.name for c in constraint.columns) for constraint in table.constraints if isinstance(constraint, UniqueConstraint)}
+		present = {frozenset(constraint['column_names']) for constraint in inspector.get_unique_constraints(table.name)}
+		if wanted == present:
+			continue
+
+		old     = f'{table.name}_old'
+		columns = ', '.join(column['name'] for column in inspector.get_columns(table.name) if column['name'] in table.columns)
+
+		conn.exec_driver_sql(f'ALTER TABLE {table.name} RENAME TO {old}')
+		for index in inspector.get_indexes(old):
+			conn.exec_driver_sql(f'DROP INDEX {index["name"]}')  # Moved with the table, names would clash
+		table.create(bind=conn)
+		conn.exec_driver_sql(f'INSERT INTO {table.name} ({columns}) SELECT {columns} FROM {old}')
+		conn.exec_driver_sql(f'DROP TABLE {old}')
+
+def _sync_indexes(conn):
+	'''Creates missing indexes and rebuilds those whose columns changed.'''
+	inspector = inspect(conn)
+	for table in Base.metadata.sorted_tables:
+		present = {index['name']: index['column_names'] for index in inspector.get_indexes(table.name)}
+		for index in table.indexes:
+			columns = [column.name for column in index.columns]
+			if index.name in present and present[index.name] != columns:
+				index.drop(bind=conn)
+			if present.get(index.name) != columns:
+				index.create(bind=conn)
@@ -18,6 +18,7 @@ if 'CLIENT' in os.environ:
 else:
 	from .dapi              import Dapi, DapiException, DapiService
 	from .python            import Python
+	from .binder            import Binder
 
 	from .string            import String
 	from .highlight         import Highlight
@@ -25,12 +26,16 @@ else:
 	from .module            import Module
 	from .o                 import O
 	from .model             import Model
+	from .model_batcher     import ModelBatcher
+	from .json_stream       import JsonStream
 
 	from .operator          import Operator
 	from .agent             import Agent
 	from .expert            import Expert
 
 	from .execution_context import ExecutionContext
+	from .trace_sink        import TraceEvent, TraceSink, NullSink, RingSink, JsonlSink, ConsoleSink, create_sink
+	from .metrics           import Metrics
 
 	from .reserved          import is_reserved
 	from .autoargs          import autoargs, autodecorate
@@ -0,0 +1,197 @@
+from typing import Any
+
+from .dapi_exception import DapiException
+
+
+class Binder:
+	'''
+	Packs call arguments into an operator input dict and wraps raw output into an output dict.
+	Built once per operator definition; detailed diagnostics are produced only on failure.
+	'''
+
+	def __init__(
+		self,
+		operator_name   : str,
+		input_fields    : list[str],
+		input_required  : set[str],
+		output_fields   : list[str]
+	):
+		self.operator_name  = operator_name
+		self.input_fields   = input_fields
+		self.input_set      = frozenset(input_fields)
+		self.input_required = frozenset(input_required)
+		self.input_count    = len(input_fields)
+		self.output_fields  = output_fields
+		self.output_count   = len(output_fields)
+		self.output_first   = output_fields[0] if output_fields else None
+
+	############################################################################
+
+	def bind_input(self, args: list[Any], kwargs: dict[str, Any]) -> dict:
+		'''Maps positional args and keyword kwargs to the declared input fields.'''
+		n = len(args)
+
+		if n <= self.input_count and kwargs.keys() <= self.input_set:
+			parameters = dict(zip(self.input_fields, args))
+			for param in self.input_fields[n:]:
+				if param in kwargs:
+					parameters[param] = kwargs[param]
+				elif param == 'self':
+					parameters[param] = None
+
+			if self.input_required <= parameters.keys():
+				return parameters
+
+		return self._diagnose_input(args, kwargs)
+
+	def bind_output(self, output: Any) -> dict:
+		'''Wraps a raw operator output (single value or tuple) into a dict of output fields.'''
+		if self.output_count == 1:
+			return { self.output_first: output }
+
+		if self.output_count and isinstance(output, tuple) and len(output) == self.output_count:
+			return dict(zip(self.output_fields, output))
+
+		return self._diagnose_output(output)
+
+	############################################################################
+
+	def _diagnose_input(self, args: list[Any], kwargs: dict[str, Any]) -> dict:
+		operator_name   = self.operator_name
+		expected_fields = self.input_fields
+		required_fields = self.input_required
+
+		# Utility to build detailed error context, phrased from operator's perspective
+		def make_detail(message: str, error_type: str, extra: dict = {}) -> dict:
+			return {
+				'message'    : message,
+				'error_type' : error_type,
+				'operator'   : operator_name,
+				'args'       : args,
+				'kwargs'     : kwargs,
+				'declared_input_fields': expected_fields,
+				**extra
+			}
+
+		provided = {}
+
+		# 1. Map positional args to declared fields in InputType
+		for param, value in zip(expected_fields, args):
+			provided[param] = value
+
+		# 2. Fill remaining fields from keyword args
+		for param in expected_fields:
+			if param not in provided and param in kwargs:
+				provided[param] = kwargs[param]
+
+		# 3. Auto-inject self if present in schema
+		if 'self' in expected_fields and 'self' not in provided:
+			provided['self'] = None
+
+		# 4. Fail if operator was defined with too few input fields
+		if len(args) > len(expected_fields):
+			raise DapiException(
+				status_code = 422,
+				detail      = make_detail(
+					message    = (
+						f'Operator `{operator_name}` declares only {len(expected_fields)} input field(s), '
+						f'but received {len(args)} positional argument(s): {args}'
+					),
+					error_type = 'TooManyArgs'
+				),
+				severity = DapiException.HALT
+			)
+
+		# 5. Fail if keyword arguments are passed that are not defined in operator's InputType
+		unexpected_keys = set(kwargs.keys()) - set(expected_fields)
+		if unexpected_keys:
+			raise DapiException(
+				status_code = 422,
+				detail      = make_detail(
+					message    = (
+						f'Operator `{operator_name}` received undeclared input fields: {", ".join(unexpected_keys)} '
+					),
+					error_type = 'UnexpectedKwargs'
+				),
+				severity = DapiException.HALT
+			)
+
+		# 6. Validate that all required parameters are present
+		parameters = {}
+		for param in expected_fields:
+			if param in provided:
+				parameters[param] = provided[param]
+			elif param in required_fields:
+				raise DapiException(
+					status_code = 422,
+					detail      = make_detail(
+						message    = (
+							f'Operator `{operator_name}` requires parameter `{param}` '
+							f'in its InputType, but received {list(provided.keys())}'
+						),
+						error_type = 'MissingRequired'
+					),
+					severity = DapiException.HALT
+				)
+
+		return parameters
+
+	def _diagnose_output(self, output: Any) -> dict:
+		operator_name   = self.operator_name
+		expected_fields = self.output_fields
+
+		# Utility to build detailed error context, phrased from operator's perspective
+		def make_detail(message: str, error_type: str) -> dict:
+			return {
+				'message'    : message,
+				'error_type' : error_type,
+				'operator'   : operator_name,
+				'expected'   : expected_fields,
+				'actual'     : output
+			}
+
+		# 1. Fail if operator does not define any output fields at all
+		if not expected_fields:
+			raise DapiException(
+				status_code = 500,
+				detail      = make_detail(
+					message    = f'Operator `{operator_name}` has no output fields defined in OutputType.',
+					error_type = 'MissingOutputFields'
+				),
+				severity = DapiException.HALT
+			)
+
+		# 2. Single-field output — value must be scalar (not tuple/dict)
+		if len(expected_fields) == 1:
+			return { expected_fields[0]: output }
+
+		# 3. Multi-field output — value must be tuple of correct length
+		if not isinstance(output, tuple):
+			raise DapiException(
+				status_code = 422,
+				detail      = make_detail(
+					message    = (
+						f'Operator `{operator_name}` must return a tuple with values for fields: '
+						f'{", ".join(expected_fields)} — got {type(output).__name__} ({type(output).__name__}) instead.'
+					),
+					error_type = 'InvalidOutputType'
+				),
+				severity = DapiException.HALT
+			)
+
+		# 4. Tuple length mismatch — output must match exactly
+		if len(output) != len(expected_fields):
+			raise DapiException(
+				status_code = 422,
+				detail      = make_detail(
+					message    = (
+						f'Operator `{operator_name}` returned tuple of length {len(output)}, '
+						f'but OutputType declares {len(expected_fields)} fields: {", ".join(expected_fields)}.'
+					),
+					error_type = 'OutputLengthMismatch'
+				),
+				severity = DapiException.HALT
+			)
+
+		# 5. Build named output dict from tuple
+		return { field: value for field, value in zip(expected_fields, output) }
@@ -1,4 +1,4 @@
-import asyncio, traceback
+import os, asyncio, traceback
 
 from enum                 import Enum
 from typing               import Any, Callable, Type, List, Dict
@@ -8,7 +8,9 @@ from fastapi.responses    import JSONResponse
 
 from .string              import String
 from .odb                 import ODB
-from wordwield.db         import Base, engine, session
+from .metrics             import Metrics
+from .trace_sink          import create_sink
+from wordwield.db         import migrate, session
 from .dapi_exception      import DapiException
 
 ########################################################################
@@ -20,11 +22,13 @@ class Dapi:
 		self.app         = None
 		self.odb         = ODB
 		self.odb.session = self.db
+		self.metrics     = Metrics(enabled=os.environ.get('METRICS_ENABLED', '1') == '1')
+		self.trace_sink  = create_sink(os.environ.get('TRACE_SINK', 'console'))  # Shared by every request's ExecutionContext
 
 		for cls in services:
 			setattr(self, String.camel_to_snake(cls.__name__), cls(self))
 
-		Base.metadata.create_all(bind=engine)
+		migrate()
 
 		print('\nDAPI Controller is initiated\n')
 
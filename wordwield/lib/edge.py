@@ -1,24 +1,29 @@
 from typing import Any
 
-from sqlalchemy import and_, or_
+from sqlalchemy     import and_, or_, event
 
-from wordwield.db import EdgeRecord
+from wordwield.db   import EdgeRecord, EdgeTypeRecord, SessionLocal
 
 
 class Edge:
+	type_ids = {}  # Engine → {class name → interned id in its `edge_types`}
+
 	def __init__(self, session):
-		self.session = session
-		self.model   = EdgeRecord
+		self.session  = session
+		self.model    = EdgeRecord
+		self.type_ids = Edge.type_ids.setdefault(session.get_bind(), {})
 
 	# Private methods
 	############################################################################
 
-	def _create(self, id1, id2, type1, type2, rel1, rel2, key1='', key2=''):
+	def _create(self, id1, id2, type1, type2, tid1, tid2, rel1, rel2, key1='', key2=''):
 		record = self.model(
 			id1   = id1,
 			id2   = id2,
 			type1 = type1,
 			type2 = type2,
+			tid1  = tid1,
+			tid2  = tid2,
 			rel1  = rel1,
 			rel2  = rel2,
 			key1  = key1,
@@ -26,29 +31,30 @@ class Edge:
 		)
 		self.session.add(record)
 
-	def _update(self, id1, id2, rel1, rel2, key1='', key2='') -> bool:
+	def _update(self, id1, id2, tid1, tid2, rel1, rel2, key1='', key2='') -> bool:
 		q = self.session.query(self.model)
 
 		candidates = q.filter(
-			self._get_filter(id1, id2, rel1, rel2)
+			self._get_filter(id1, id2, tid1, tid2, rel1, rel2)
 		).all()
 
+		end1, end2 = (tid1, id1), (tid2, id2)
 		for edge in candidates:
 			updated = False
 
 			if not edge.key1:
-				if edge.id1 == id1 and key1:
+				if (edge.tid1, edge.id1) == end1 and key1:
 					edge.key1 = key1
 					updated   = True
-				elif edge.id1 == id2 and key2:
+				elif (edge.tid1, edge.id1) == end2 and key2:
 					edge.key1 = key2
 					updated   = True
 
 			if not edge.key2:
-				if edge.id2 == id2 and key2:
+				if (edge.tid2, edge.id2) == end2 and key2:
 					edge.key2 = key2
 					updated   = True
-				elif edge.id2 == id1 and key1:
+				elif (edge.tid2, edge.id2) == end1 and key1:
 					edge.key2 = key1
 					updated   = True
 
@@ -58,14 +64,16 @@ class Edge:
 
 		return False
 
-	def _get_filter(self, id1, id2, rel1, rel2):
+	def _get_filter(self, id1, id2, tid1, tid2, rel1, rel2):
 		return or_(
 			and_(
 				self.model.id1  == id1,  self.model.id2  == id2,
+				self.model.tid1 == tid1, self.model.tid2 == tid2,
 				self.model.rel1 == rel1, self.model.rel2 == rel2
 			),
 			and_(
 				self.model.id1  == id2,  self.model.id2  == id1,
+				self.model.tid1 == tid2, self.model.tid2 == tid1,
 				self.model.rel1 == rel2, self.model.rel2 == rel1
 			)
 		)
@@ -74,20 +82,77 @@ class Edge:
 	############################################################################
 
 	def set(self, id1, id2, type1, type2, rel1, rel2, key1='', key2=''):
-		if not self._update(id1, id2, rel1, rel2, key1, key2):
-			self._create(id1, id2, type1, type2, rel1, rel2, key1, key2)
-
-	def unset(self, id1, id2, rel1, rel2):
+		tid1 = self.get_type_id(type1, create=True)
+		tid2 = self.get_type_id(type2, create=True)
+		if not self._update(id1, id2, tid1, tid2, rel1, rel2, key1, key2):
+			self._create(id1, id2, type1, type2, tid1, tid2, rel1, rel2, key1, key2)
+
+	def unset(self, id1, id2, type1, type2, rel1, rel2):
+		tid1 = self.get_type_id(type1)
+		tid2 = self.get_type_id(type2)
+		if tid1 is None or tid2 is None:
+			return  # No edge was ever written for one of the types
 		self.session.query(self.model).filter(
-			self._get_filter(id1, id2, rel1, rel2)
+			self._get_filter(id1, id2, tid1, tid2, rel1, rel2)
 		).delete()
 
+	def get_type_id(self, name: str, create: bool = False) -> int | None:
+		'''Interned id of a class name; None for a name no edge refers to, unless `create`.'''
+		tid = self.type_ids.get(name)
+		if tid is None:
+			tid = self.session.query(EdgeTypeRecord.id).filter(EdgeTypeRecord.name == name).scalar()
+			if tid is None and create:
+				record = EdgeTypeRecord(name=name)
+				self.session.add(record)
+				self.session.flush()
+				tid = record.id
+			if tid is not None:
+				self.type_ids[name] = tid
+		return tid
+
+	def get_many(self, ids_by_type: dict[str, list[int]]):
+		'''Edges touching any of the ids on either end, type-qualified, in creation order.'''
+		ends = []
+		for type_name, ids in ids_by_type.items():
+			tid = self.get_type_id(type_name)
+			if tid is not None:
+				ends += [
+					(EdgeRecord.tid1 == tid) & EdgeRecord.id1.in_(ids),
+					(EdgeRecord.tid2 == tid) & EdgeRecord.id2.in_(ids)
+				]
+		if not ends:
+			return []
+		return self.session.query(EdgeRecord).filter(or_(*ends)).order_by(EdgeRecord.id).all()
+
 	def get(self, obj: Any, rel: str = None):
-		query = self.session.query(EdgeRecord).filter(
-			(EdgeRecord.id1 == obj.id) | (EdgeRecord.id2 == obj.id)
-		)
+		'''
+		Edges where `obj` is the source with `rel` as the forward field, or the
+		target with `rel` as the reverse field. Two queries, one per direction,
+		so each is served by its own index instead of an OR over both.
+		'''
+		tid = self.get_type_id(type(obj).__name__)
+		if tid is None:
+			return []
+
+		forward = self.session.query(EdgeRecord).filter(EdgeRecord.id1 == obj.id, EdgeRecord.tid1 == tid)
+		reverse = self.session.query(EdgeRecord).filter(EdgeRecord.id2 == obj.id, EdgeRecord.tid2 == tid)
 		if rel is not None:
-			query = query.filter(
-				(EdgeRecord.rel1 == rel) | (EdgeRecord.rel2 == rel)
-			)
-		return query.all()
+			forward = forward.filter(EdgeRecord.rel1 == rel)
+			reverse = reverse.filter(EdgeRecord.rel2 == rel)
+		return forward.union(reverse).order_by(EdgeRecord.id).all()
+
+	def delete_all(self, obj: Any):
+		'''Removes every edge touching `obj` on either end.'''
+		tid = self.get_type_id(type(obj).__name__)
+		if tid is None:
+			return
+		self.session.query(EdgeRecord).filter(
+			((EdgeRecord.id1 == obj.id) & (EdgeRecord.tid1 == tid)) |
+			((EdgeRecord.id2 == obj.id) & (EdgeRecord.tid2 == tid))
+		).delete()
+
+
+@event.listens_for(SessionLocal, 'after_rollback')
+def _forget_type_ids(session):
+	# Ids interned in the rolled back transaction are gone. Cleared in place: Edge instances keep the dict
+	Edge.type_ids.get(session.get_bind(), {}).clear()
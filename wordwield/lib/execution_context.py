@@ -1,5 +1,9 @@
-from .string    import String
-from .highlight import Highlight
+import asyncio, contextvars, time
+
+from typing      import Any
+
+from .string     import String
+from .trace_sink import TraceEvent, TraceSink, ConsoleSink
 
 class Frame:
 	def __init__(
@@ -9,78 +13,104 @@ class Frame:
 		restrict   : bool  = True,
 		file       : str   = None,
 		line       : str   = None,
-		importance : float = 0
+		importance : float = 0,
+		kind       : str   = None
 	):
 		self.name       = name
+		self.kind       = kind  # 'operator', 'llm' or None
 		self.file       = file
 		self.line       = line
 		self.lineno     = lineno
 		self.restrict   = restrict
 		self.importance = importance
 		self.subframes  = []
+		self.timestamp  = time.time()
+		self.started    = time.perf_counter()
+		self.duration   = None
+
+class Branch:
+	'''Frame stack and indent of one asyncio task within an ExecutionContext.'''
+	def __init__(self, stack: list[Frame], indent: int = 0, task: asyncio.Task = None):
+		self.stack  = stack
+		self.indent = indent
+		self.task   = task
+
+_branches = contextvars.ContextVar('execution_context_branches', default=None)  # ExecutionContext → Branch of the running task
+
+def _current_task():
+	try:
+		return asyncio.current_task()
+	except RuntimeError:
+		return None
 
 class ExecutionContext:
 	def __init__(self,
-		enable_color  : bool  = True,
-		enable_code   : bool  = True,
-		importance    : float = 0.5
+		enable_color  : bool      = True,
+		enable_code   : bool      = True,
+		importance    : float     = 0.5,
+		sink          : TraceSink = None,
+		stream        : asyncio.Queue | None = None
 	):
 		self._root        = Frame(name='root', lineno=0, restrict=True)
-		self._stack       = [self._root]
-		self._indent      = 0
 		self._indent_text = String.color(' ', String.GRAY) if enable_color else ' '
-		self.i            = ''
 
 		self.enable_color  = enable_color
 		self.enable_code   = enable_code
 		self.enable_detail = True
 		self.importance    = importance
+		self.sink          = sink or ConsoleSink(enable_color, enable_code)
+		self.stream        = stream  # Queue receiving model output events while the request runs
+		self.limiter       = None    # Semaphore shared by every call_many of this context, created on first use
 
 	#################################################################
 
-	def _get_code(self, frame):
-		if self.enable_code and frame.line:
-			code = frame.line.strip() + '\n'
-			if self.enable_color:
-				code = Highlight.python(code).replace('\n', '')
-			return code
-		return ''
+	def _find_branch(self) -> Branch | None:
+		return (_branches.get() or {}).get(self)
 
-	def _get_block_icon(self, frame):
-		if not self.enable_color:
-			return '▮'
-		color = String.RED if frame.restrict else String.GREEN
-		return String.color('▮', color)
+	def _set_branch(self, branch: Branch):
+		# Copied, never mutated: child tasks share the mapping they inherited
+		_branches.set({**(_branches.get() or {}), self: branch})
 
-	def _get_name(self, frame):
-		return frame.name
+	def _get_branch(self) -> Branch:
+		'''Returns the branch of the running task, starting one if the task has none yet.'''
+		branch = self._find_branch()
+		task   = _current_task()
 
-	def _get_detail(self, detail=''):
-		if self.enable_color:
-			detail = String.color(detail, String.GRAY, 'i')
-		return detail
+		if branch is None:
+			branch = Branch([self._root], task=task)
+			self._set_branch(branch)
 
-	def _get_direction(self, is_push):
-		direction = '→' if is_push else '←'
-		if self.enable_color:
-			color = String.GREEN if is_push else String.RED
-			direction = String.color(direction, color)
-		return direction
-
-	def _get_line(self, frame, is_push=True, detail=None):
-		icon      = self._get_block_icon(frame)
-		name      = self._get_name(frame)
-		code      = self._get_code(frame)
-		detail    = self._get_detail(detail)
-		direction = self._get_direction(is_push)
-		left      = f'{icon}{self.i} {direction} {name} :'
-		return    f'{left} {code}{detail}'
+		elif branch.task is not task:
+			# Inherited from the parent task: hang a new branch off the parent's current frame
+			branch = self._start_branch(branch, task.get_name() if task else 'branch', task)
 
-	#################################################################
+		return branch
+
+	def _start_branch(self, parent: Branch, name: str, task: asyncio.Task) -> Branch:
+		current = parent.stack[-1]
+		frame   = Frame(name=name, lineno=current.lineno, restrict=current.restrict)
+		branch  = Branch([frame], parent.indent, task)
+
+		current.subframes.append(frame)
+		self._set_branch(branch)
+		return branch
+
+	@property
+	def root(self) -> Frame:
+		return self._root
 
 	@property
 	def current(self) -> Frame:
-		return self._stack[-1]
+		return self._get_branch().stack[-1]
+
+	@property
+	def i(self) -> str:
+		return self._color(self._indent_text) * self._get_branch().indent
+
+	def enter_branch(self, name: str):
+		'''Starts a named branch for the running task, under the current frame of its parent task.'''
+		parent = self._find_branch() or Branch([self._root])
+		self._start_branch(parent, name, _current_task())
 
 	def _color(self, text: str) -> str:
 		if self.enable_color:
@@ -88,8 +118,21 @@ class ExecutionContext:
 		return text
 
 	def update_indent(self, n: int):
-		self._indent += n
-		self.i = self._color(self._indent_text) * self._indent
+		self._get_branch().indent += n
+
+	def _record(self, kind, frame, depth, detail):
+		self.sink.record(TraceEvent(
+			kind       = kind,
+			name       = frame.name,
+			depth      = depth,
+			restrict   = frame.restrict,
+			lineno     = frame.lineno,
+			line       = frame.line,
+			importance = frame.importance,
+			timestamp  = frame.timestamp,
+			duration   = frame.duration or 0,
+			detail     = detail
+		))
 
 	def push(self, 
 		name       : str,
@@ -98,31 +141,37 @@ class ExecutionContext:
 		file       : str   = None,
 		line       : str   = None,
 		importance : float = 0,
-		detail     : str   = None
+		detail     : Any   = None,
+		kind       : str   = None
 	):
+		'''Opens a frame. `detail` may be any object or a callable; it is stringified only if rendered.'''
 		frame = Frame(
 			name       = name,
 			file       = file,
 			line       = line,
 			lineno     = lineno,
 			restrict   = restrict,
-			importance = importance
+			importance = importance,
+			kind       = kind
 		)
 
-		self.current.subframes.append(frame)
-		self._stack.append(frame)
+		branch = self._get_branch()
+		branch.stack[-1].subframes.append(frame)
+		branch.stack.append(frame)
 
-		if frame.importance > self.importance:
-			print(self._get_line(frame=frame, is_push=True, detail=detail))
-		self.update_indent(1)
+		if frame.importance > self.importance and self.sink.enabled:
+			self._record('push', frame, branch.indent, detail)
+		branch.indent += 1
+
+	def pop(self, detail: Any = None):
+		branch = self._get_branch()
+		if len(branch.stack) > 1:
+			frame          = branch.stack.pop()
+			frame.duration = time.perf_counter() - frame.started
+			branch.indent -= 1
 
-	def pop(self, detail=None):
-		if len(self._stack) > 1:
-			frame = self._stack.pop()
 			if not self.enable_detail and frame.restrict:
-				self.update_indent(-1)
 				return
-			
-			self.update_indent(-1)
-			if frame.importance > self.importance:
-				print(self._get_line(frame, is_push=False, detail=detail))
+
+			if frame.importance > self.importance and self.sink.enabled:
+				self._record('pop', frame, branch.indent, detail)
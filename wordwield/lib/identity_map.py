@@ -0,0 +1,92 @@
+import weakref
+
+from collections import OrderedDict
+
+
+class IdentityMap:
+	'''
+	Loaded O instances keyed by (class, id), so each record maps to one object.
+	The `size` most recently used are held strongly (LRU); the rest are held by
+	weak reference only and stay mapped while something else still uses them.
+	'''
+
+	def __init__(self, size: int = 10000):
+		self.size    = size
+		self.recent  = OrderedDict()                 # key → o, strongly held, least recent first
+		self.mapped  = weakref.WeakValueDictionary()  # key → o, every object still alive
+		self.stats   = {
+			'hits'      : 0,
+			'misses'    : 0,
+			'evictions' : 0  # Dropped from the LRU, still mapped until collected
+		}
+
+	############################################################################
+
+	def _touch(self, key, o):
+		self.recent[key] = o
+		self.recent.move_to_end(key)
+		while len(self.recent) > self.size:
+			self.recent.popitem(last=False)
+			self.stats['evictions'] += 1
+
+	############################################################################
+
+	def get(self, key, default=None):
+		o = self.mapped.get(key)
+		if o is None:
+			self.stats['misses'] += 1
+			return default
+
+		self.stats['hits'] += 1
+		self._touch(key, o)
+		return o
+
+	def evict(self, key):
+		self.recent.pop(key, None)
+		self.mapped.pop(key, None)
+
+	def clear(self):
+		self.recent.clear()
+		self.mapped.clear()
+
+	def values(self) -> list:
+		return list(self.mapped.values())
+
+	def to_dict(self) -> dict:
+		lookups = self.stats['hits'] + self.stats['misses']
+		return {
+			'size'     : self.size,
+			'resident' : len(self.recent),
+			'mapped'   : len(self.mapped),
+			'hit_rate' : self.stats['hits'] / lookups if lookups else 0.0,
+			**self.stats
+		}
+
+	def to_prometheus(self, name: str = 'wordwield_odb_identity') -> str:
+		stats = self.to_dict()
+		return '\n'.join([
+			f'# HELP {name}_lookups_total Identity map lookups by result.',
+			f'# TYPE {name}_lookups_total counter',
+			f'{name}_lookups_total{{result="hit"}} {stats["hits"]}',
+			f'{name}_lookups_total{{result="miss"}} {stats["misses"]}',
+			f'# HELP {name}_evictions_total Objects dropped from the LRU tier.',
+			f'# TYPE {name}_evictions_total counter',
+			f'{name}_evictions_total {stats["evictions"]}',
+			f'# HELP {name}_objects Objects in the map: strongly held (resident) and all still alive (mapped).',
+			f'# TYPE {name}_objects gauge',
+			f'{name}_objects{{tier="resident"}} {stats["resident"]}',
+			f'{name}_objects{{tier="mapped"}} {stats["mapped"]}'
+		]) + '\n'
+
+	def __setitem__(self, key, o):
+		self.mapped[key] = o
+		self._touch(key, o)
+
+	def __getitem__(self, key):
+		o = self.get(key)
+		if o is None:
+			raise KeyError(key)
+		return o
+
+	def __contains__(self, key) : return key in self.mapped
+	def __len__(self)           : return len(self.mapped)
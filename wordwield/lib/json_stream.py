@@ -0,0 +1,79 @@
+import json
+
+from typing import Any
+
+
+class JsonStream:
+	'''
+	Incremental parser for a streamed JSON object.
+	`feed` returns top-level fields as soon as their values are complete.
+
+	Usage:
+		stream = JsonStream()
+		for chunk in chunks:
+			for name, value in stream.feed(chunk):
+				...
+	'''
+
+	def __init__(self):
+		self.buffer      = ''
+		self.pos         = 0      # Next character to scan
+		self.depth       = 0
+		self.in_string   = False
+		self.escape      = False
+		self.key_start   = None
+		self.key         = None
+		self.value_start = None
+		self.done        = False
+
+	def _emit(self, end: int, fields: list):
+		if self.key is not None and self.value_start is not None:
+			raw = self.buffer[self.value_start:end].strip()
+			try:
+				fields.append((self.key, json.loads(raw)))
+			except json.JSONDecodeError:
+				pass  # Left for the final, full decode to report
+		self.key         = None
+		self.value_start = None
+
+	def feed(self, chunk: str) -> list[tuple[str, Any]]:
+		fields       = []
+		self.buffer += chunk
+
+		while self.pos < len(self.buffer) and not self.done:
+			i, c     = self.pos, self.buffer[self.pos]
+			self.pos = i + 1
+
+			if self.in_string:
+				if self.escape:
+					self.escape = False
+				elif c == '\\':
+					self.escape = True
+				elif c == '"':
+					self.in_string = False
+					if self.depth == 1 and self.key_start is not None:
+						self.key       = json.loads(self.buffer[self.key_start:i + 1])
+						self.key_start = None
+				continue
+
+			if c == '"':
+				self.in_string = True
+				if self.depth == 1 and self.value_start is None:
+					self.key_start = i
+
+			elif c in '{[':
+				self.depth += 1
+
+			elif c in '}]':
+				self.depth -= 1
+				if self.depth == 0:
+					self._emit(i, fields)
+					self.done = True
+
+			elif self.depth == 1:
+				if c == ':':
+					self.value_start = i + 1
+				elif c == ',':
+					self._emit(i, fields)
+
+		return fields
@@ -0,0 +1,155 @@
+from .execution_context import Frame
+
+
+class Histogram:
+	'''Cumulative histogram, Prometheus style. Defaults to latency buckets in seconds.'''
+
+	BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+	def __init__(self, buckets: tuple = None):
+		self.buckets = buckets or self.BUCKETS
+		self.counts  = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+		self.sum     = 0.0
+		self.count   = 0
+
+	def observe(self, value: float):
+		for i, bound in enumerate(self.buckets):
+			if value <= bound:
+				break
+		else:
+			i = len(self.buckets)
+
+		self.counts[i] += 1
+		self.sum       += value
+		self.count     += 1
+
+	def cumulative(self) -> list[tuple[str, int]]:
+		result, total = [], 0
+		for bound, count in zip((*self.buckets, '+Inf'), self.counts):
+			total += count
+			result.append((str(bound), total))
+		return result
+
+	def to_dict(self) -> dict:
+		return {
+			'count'   : self.count,
+			'sum'     : self.sum,
+			'buckets' : dict(self.cumulative())
+		}
+
+	def to_prometheus(self, name: str, labels: str) -> list[str]:
+		lines = [f'{name}_bucket{{{labels},le="{bound}"}} {count}' for bound, count in self.cumulative()]
+		lines.append(f'{name}_sum{{{labels}}} {self.sum}')
+		lines.append(f'{name}_count{{{labels}}} {self.count}')
+		return lines
+
+
+class Metrics:
+	'''
+	Per-operator call counts and latency histograms, collected from finished
+	ExecutionContext frame trees. Kinds: `total` wall time, `self` time without
+	child operator calls, `llm` time spent inside `ask`.
+	'''
+
+	KINDS = ('total', 'self', 'llm')
+
+	def __init__(self, enabled: bool = True):
+		self.enabled   = enabled
+		self.operators = {}  # name → { kind → Histogram }
+
+	############################################################################
+
+	def _get(self, name: str) -> dict[str, Histogram]:
+		histograms = self.operators.get(name)
+		if histograms is None:
+			histograms = self.operators[name] = {kind: Histogram() for kind in self.KINDS}
+		return histograms
+
+	@staticmethod
+	def _covered(intervals: list[tuple]) -> float:
+		'''Length of the union of (start, end) intervals: overlapping calls under call_many count once.'''
+		total, reach = 0.0, None
+		for start, end in sorted(intervals):
+			if reach is None or start > reach:
+				total += end - start
+				reach  = end
+			elif end > reach:
+				total += end - reach
+				reach  = end
+		return total
+
+	def _walk(self, frame: Frame, observations: list):
+		'''Returns the (start, end) intervals of operator and llm frames below `frame` that belong to its nearest operator.'''
+		children, llms = [], []
+
+		for sub in frame.subframes:
+			if sub.kind and sub.duration is None:
+				continue  # Still running
+
+			if sub.kind == 'operator':
+				sub_children, sub_llms = self._walk(sub, observations)
+				observations.append((
+					sub.name,
+					sub.duration,
+					max(sub.duration - self._covered(sub_children + sub_llms), 0.0),
+					self._covered(sub_llms)
+				))
+				children.append((sub.started, sub.started + sub.duration))
+
+			elif sub.kind == 'llm':
+				llms.append((sub.started, sub.started + sub.duration))
+
+			else:
+				sub_children, sub_llms = self._walk(sub, observations)
+				children += sub_children
+				llms     += sub_llms
+
+		return children, llms
+
+	############################################################################
+
+	def collect(self, root: Frame):
+		'''Records every finished operator frame under `root`.'''
+		if not self.enabled:
+			return
+
+		observations = []
+		self._walk(root, observations)
+
+		for name, total, own, llm in observations:
+			histograms = self._get(name)
+			histograms['total'].observe(total)
+			histograms['self'].observe(own)
+			histograms['llm'].observe(llm)
+
+	def reset(self):
+		self.operators.clear()
+
+	def to_dict(self) -> dict:
+		return {
+			name: {
+				'calls' : histograms['total'].count,
+				**{kind: histogram.to_dict() for kind, histogram in histograms.items()}
+			}
+			for name, histograms in self.operators.items()
+		}
+
+	def to_prometheus(self) -> str:
+		lines = [
+			'# HELP wordwield_operator_calls_total Finished operator invocations.',
+			'# TYPE wordwield_operator_calls_total counter'
+		]
+		items = sorted(self.operators.items())
+
+		for name, histograms in items:
+			lines.append(f'wordwield_operator_calls_total{{operator="{name}"}} {histograms["total"].count}')
+
+		lines += [
+			'# HELP wordwield_operator_seconds Operator latency by kind: total, self (without child calls), llm (inside ask).',
+			'# TYPE wordwield_operator_seconds histogram'
+		]
+		for name, histograms in items:
+			for kind, histogram in histograms.items():
+				lines += histogram.to_prometheus('wordwield_operator_seconds', f'operator="{name}",kind="{kind}"')
+
+		return '\n'.join(lines) + '\n'
@@ -1,44 +1,237 @@
-import os, re
+import os, re, copy, json, asyncio
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 
 from .module          import Module
 from .string          import String
 from .o               import O
 from .dapi_exception  import DapiException
 from .transform       import T
+from .model_cache     import ModelCache
+from .model_batcher   import ModelBatcher
+from .json_stream     import JsonStream
+
+from wordwield.db     import SessionLocal
 
 PROJECT_PATH = os.environ.get('PROJECT_PATH')
 MODELS_DIR   = os.environ.get('MODELS_DIR')
 MODELS_PATH  = os.path.join(PROJECT_PATH, MODELS_DIR)
 
+MODEL_CACHE           = os.environ.get('MODEL_CACHE', '')  # '', 'memory' or 'disk'
+MODEL_CACHE_SIZE      = int(os.environ.get('MODEL_CACHE_SIZE', 1024))
+MODEL_CACHE_DISK_SIZE = int(os.environ.get('MODEL_CACHE_DISK_SIZE', 100000))
+MODEL_CACHE_TTL       = float(os.environ.get('MODEL_CACHE_TTL', 0)) or None
+MODEL_SINGLE_FLIGHT   = os.environ.get('MODEL_SINGLE_FLIGHT', '1') == '1'
+MODEL_BATCH_SIZE      = int(os.environ.get('MODEL_BATCH_SIZE', 1))  # 1 dispatches every request on its own
+MODEL_BATCH_WAIT      = float(os.environ.get('MODEL_BATCH_WAIT', 10)) / 1000
+
 
 class Model:
 
+	providers   = {}  # provider → Model subclass, each provider module is imported once
+	instances   = {}  # model_id → long-lived Model instance with its client
+	concurrency = 8   # Max in-flight requests per provider, overridden by providers
+	inflight    = {}  # request key → task of the identical request currently in flight
+	coalesced   = 0   # Requests served by joining an in-flight task
+	batchers    = {}  # model_id → ModelBatcher
+	batch_size  = MODEL_BATCH_SIZE
+	batch_wait  = MODEL_BATCH_WAIT
+
+	cache = ModelCache(
+		size            = MODEL_CACHE_SIZE,
+		ttl             = MODEL_CACHE_TTL,
+		session_factory = SessionLocal if MODEL_CACHE == 'disk' else None,
+		disk_size       = MODEL_CACHE_DISK_SIZE
+	) if MODEL_CACHE else None
+
 	def __init__(self, name: str):
-		self.name = name
+		self.name    = name
+		self.formats = {}  # id(schema) → (schema, provider format)
 
 	##################################################################
 
+	@classmethod
+	def get_semaphore(cls) -> asyncio.Semaphore:
+		'''One semaphore per provider class, limiting its concurrent requests.'''
+		if '_semaphore' not in cls.__dict__:
+			cls._semaphore = asyncio.Semaphore(cls.concurrency)
+		return cls._semaphore
+
+	async def batch(self, requests: list[dict]) -> list:
+		'''
+		Runs a batch of `__call__` parameter dicts, returning a result or exception per request.
+		Default releases them together so the backend can serve them in parallel slots.
+		'''
+		return await asyncio.gather(*(self(**params) for params in requests), return_exceptions=True)
+
+	def get_batcher(self) -> ModelBatcher | None:
+		if self.batch_size <= 1:
+			return None
+
+		batcher = Model.batchers.get(self.model_id)
+		if batcher is None:
+			batcher = Model.batchers[self.model_id] = ModelBatcher(self, self.batch_size, self.batch_wait)
+		return batcher
+
+	@classmethod
+	def batch_stats(cls) -> dict:
+		return {model_id: batcher.to_dict() for model_id, batcher in Model.batchers.items()}
+
+	@classmethod
+	def batch_prometheus(cls) -> str:
+		lines = [
+			'# HELP wordwield_model_batch_fill Dispatched batch size relative to the max batch size.',
+			'# TYPE wordwield_model_batch_fill histogram'
+		]
+		batchers = sorted(Model.batchers.items())
+		for _, batcher in batchers:
+			lines += batcher.fill.to_prometheus('wordwield_model_batch_fill', f'model="{batcher.model.model_id}"')
+
+		lines += [
+			'# HELP wordwield_model_queue_seconds Time a request waited for its batch to be dispatched.',
+			'# TYPE wordwield_model_queue_seconds histogram'
+		]
+		for _, batcher in batchers:
+			lines += batcher.delay.to_prometheus('wordwield_model_queue_seconds', f'model="{batcher.model.model_id}"')
+
+		return '\n'.join(lines) + '\n'
+
+	def get_format(self, schema: dict, build) -> dict:
+		'''Provider-specific form of `schema`, built once per schema object by `build(schema)`.'''
+		entry = self.formats.get(id(schema))
+		if entry is None or entry[0] is not schema:
+			entry = self.formats[id(schema)] = (schema, build(schema))  # Holding schema keeps its id unique
+		return entry[1]
+
+	def sanitize(self, text: str) -> str:
+		'''Repairs provider-specific output artifacts. Only used when strict decode fails.'''
+		return text
+
+	def decode(self, output: str | dict, response_model: type[O]) -> dict:
+		'''
+		Validates model output into the fields of `response_model`. Text goes straight
+		through pydantic's JSON parser; `sanitize` is retried only if that fails.
+		'''
+		plain = response_model.to_plain_model()
+
+		if not isinstance(output, str):
+			return plain.model_validate(output).model_dump()
+
+		try:
+			return plain.model_validate_json(output).model_dump()
+		except ValidationError:
+			sanitized = self.sanitize(output)
+			if sanitized == output:
+				raise
+			return plain.model_validate_json(sanitized).model_dump()
+
+	async def stream(
+		self,
+		prompt          : str,
+		response_schema : dict,
+		role            : str        = 'user',
+		temperature     : float      = 0.0,
+		system          : str | None = None
+	):
+		'''Yields output text as it is produced. Fallback for providers without streaming.'''
+		output = await self(
+			prompt          = prompt,
+			response_schema = response_schema,
+			role            = role,
+			temperature     = temperature,
+			system          = system
+		)
+		yield output if isinstance(output, str) else json.dumps(output, ensure_ascii=False)
+
+	async def _generate_streaming(self, queue: asyncio.Queue, **kwargs) -> str:
+		'''Collects streamed output, publishing tokens and completed top-level fields to `queue`.'''
+		parser = JsonStream()
+		chunks = []
+
+		async for chunk in self.stream(**kwargs):
+			chunks.append(chunk)
+			await queue.put({'event': 'token', 'model': self.model_id, 'text': chunk})
+			for name, value in parser.feed(chunk):
+				await queue.put({'event': 'field', 'model': self.model_id, 'name': name, 'value': value})
+
+		return ''.join(chunks)
+
+	@classmethod
+	def get_provider(cls, provider: str) -> type['Model']:
+		if provider not in Model.providers:
+			file_path = os.path.join(MODELS_PATH, f'model_{provider}.py')
+
+			try:
+				model_cls = Module.find_class_by_base(Model, file_path)
+			except FileNotFoundError:
+				raise ValueError(f'Model file not found: `{file_path}`')
+
+			if model_cls is None:
+				raise ValueError(f'No subclass of Model found in `{file_path}`')
+
+			Model.providers[provider] = model_cls
+		return Model.providers[provider]
+
 	@classmethod
 	def load(cls, model_id: str) -> 'Model':
+		instance = Model.instances.get(model_id)
+		if instance is not None:
+			return instance
+
 		if '::' not in model_id:
 			raise ValueError(f'Invalid model_id: `{model_id}`. Expected format `provider::name`')
 
-		provider, name = model_id.split('::', 1)
-		file_path      = os.path.join(MODELS_PATH, f'model_{provider}.py')
+		provider, name    = model_id.split('::', 1)
+		instance          = cls.get_provider(provider)(name)
+		instance.model_id = model_id
 
-		try:
-			model_cls         = Module.find_class_by_base(cls, file_path)
-			instance          = model_cls(name)
-			instance.model_id = model_id
-			return instance
+		Model.instances[model_id] = instance
+		return instance
 
-		except FileNotFoundError:
-			raise ValueError(f'Model file not found: `{file_path}`')
+	@classmethod
+	async def _dispatch(
+		cls,
+		model_id       : str,
+		response_model : O,
+		params         : dict,
+		key            : str | None           = None,
+		stream         : asyncio.Queue | None = None
+	) -> dict:
+		model   = Model.load(model_id)
+		batcher = model.get_batcher()
+
+		# Providers return raw JSON text (or already parsed data)
+		if stream is not None:
+			output = await model._generate_streaming(stream, **params)
+		elif batcher is not None:
+			output = await batcher.submit(params)
+		else:
+			output = await model(**params)
 
-		except AttributeError:
-			raise ValueError(f'No subclass of Model found in `{file_path}`')
+		result = model.decode(output, response_model)
+
+		if key is not None and Model.cache is not None:
+			await Model.cache.aset(key, result, model_id)
+
+		return result
+
+	@classmethod
+	async def _single_flight(cls, key: str, dispatch) -> dict:
+		'''
+		Runs `dispatch` once per key at a time; concurrent identical requests await
+		the same task. Each caller gets its own copy of the result.
+		'''
+		task = Model.inflight.get(key)
+
+		if task is None:
+			task = asyncio.ensure_future(dispatch())
+			Model.inflight[key] = task
+			task.add_done_callback(lambda _: Model.inflight.pop(key, None))
+		else:
+			Model.coalesced += 1
+
+		# Shielded so one cancelled caller does not cancel the call for everyone else
+		return copy.deepcopy(await asyncio.shield(task))
 
 	@classmethod
 	async def generate(
@@ -50,24 +243,36 @@ class Model:
 		model_id       : str        = 'ollama::gemma3:4b',
 		role           : str        = 'user',
 		temperature    : float      = 0.0,
-		system         : str | None = None
+		system         : str | None = None,
+		use_cache      : bool       = True,
+		stream         : asyncio.Queue | None = None
 
 	) -> dict:
 		try:
 			if not issubclass(response_model, O):
 				raise ValueError(f'Model.generate requires `response_model` to be a subclass of `O`, but received `{type(response_model)}`')
 
-			model  = Model.load(model_id)
-			result = await model(
-				prompt          = prompt,
-				response_schema = response_model.to_schema(),
-				role            = role,
-				temperature     = temperature,
-				system          = system
-			)
-
-			# Validate output
-			response_model(**result)
+			schema = response_model.to_schema()
+			key    = ModelCache.make_key(model_id, system, role, prompt, response_model.to_schema_key(), temperature)
+			result = None
+			params = {
+				'prompt'          : prompt,
+				'response_schema' : schema,
+				'role'            : role,
+				'temperature'     : temperature,
+				'system'          : system
+			}
+
+			if use_cache and Model.cache is not None:
+				result = await Model.cache.aget(key)
+
+			if result is None:
+				# Streaming callers need their own token events, and sampled (temperature > 0)
+				# calls are meant to be independent, so neither shares a call
+				if use_cache and stream is None and MODEL_SINGLE_FLIGHT and temperature == 0:
+					result = await cls._single_flight(key, lambda: cls._dispatch(model_id, response_model, params, key if use_cache else None))
+				else:
+					result = await cls._dispatch(model_id, response_model, params, key if use_cache else None, stream)
 
 			# Unpack to tuple of attributes or single value to match operator output convention
 			result = T(T.DATA, T.ARGUMENTS, result)
@@ -0,0 +1,78 @@
+import time, asyncio
+
+from .metrics import Histogram
+
+
+class ModelBatcher:
+	'''
+	Per-model scheduler: collects requests for up to `wait` seconds or until
+	`size` of them are pending, hands them to `model.batch` together and
+	resolves each caller's future with its own result.
+	'''
+
+	FILL_BUCKETS = (0.125, 0.25, 0.5, 0.75, 1.0)
+
+	def __init__(self, model, size: int = 8, wait: float = 0.01):
+		self.model   = model
+		self.size    = size
+		self.wait    = wait
+		self.pending = []                            # (params, future, enqueued) waiting for the next batch
+		self.timer   = None                          # Flushes a partial batch once `wait` has passed
+		self.tasks   = set()                         # Batches in flight, referenced until done
+		self.fill    = Histogram(self.FILL_BUCKETS)  # Batch size / max batch size
+		self.delay   = Histogram()                   # Seconds from submit to dispatch
+
+	############################################################################
+
+	async def submit(self, params: dict) -> dict:
+		loop   = asyncio.get_running_loop()
+		future = loop.create_future()
+		self.pending.append((params, future, time.perf_counter()))
+
+		if len(self.pending) >= self.size:
+			self.flush()
+		elif self.timer is None:
+			self.timer = loop.call_later(self.wait, self.flush)
+
+		return await future
+
+	def flush(self):
+		if self.timer is not None:
+			self.timer.cancel()
+			self.timer = None
+
+		batch, self.pending = self.pending, []
+		if batch:
+			task = asyncio.ensure_future(self._dispatch(batch))
+			self.tasks.add(task)
+			task.add_done_callback(self.tasks.discard)
+
+	async def _dispatch(self, batch: list):
+		now = time.perf_counter()
+		self.fill.observe(len(batch) / self.size)
+		for _, _, enqueued in batch:
+			self.delay.observe(now - enqueued)
+
+		try:
+			results = await self.model.batch([params for params, _, _ in batch])
+		except Exception as e:
+			results = [e] * len(batch)
+
+		for (_, future, _), result in zip(batch, results):
+			if future.done():
+				continue  # Caller was cancelled
+			if isinstance(result, BaseException):
+				future.set_exception(result)
+			else:
+				future.set_result(result)
+
+	############################################################################
+
+	def to_dict(self) -> dict:
+		return {
+			'size'    : self.size,
+			'wait'    : self.wait,
+			'batches' : self.fill.count,
+			'fill'    : self.fill.to_dict(),
+			'delay'   : self.delay.to_dict()
+		}
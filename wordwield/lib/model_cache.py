@@ -0,0 +1,185 @@
+import asyncio, json, time, hashlib
+
+from collections        import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing             import Any
+
+from wordwield.db import ModelCacheRecord
+
+
+class ModelCache:
+	'''
+	Content-addressed cache of model responses: in-memory LRU tier in front of
+	an optional persistent tier in the `model_cache` table. Entries expire after
+	`ttl` seconds (never if None) and both tiers are capped by entry count.
+	Responses are kept as JSON text, so every hit returns a fresh copy.
+
+	The disk tier runs on one worker thread that owns the session: `aget` / `aset`
+	keep its SQLite I/O off the event loop, `get` / `set` wait for it.
+	'''
+
+	EVICT_EVERY = 100  # Disk writes between checks of the disk tier size
+
+	def __init__(
+		self,
+		size            : int   = 1024,
+		ttl             : float = None,
+		session_factory        = None,
+		disk_size       : int   = 100000
+	):
+		self.size      = size
+		self.ttl       = ttl
+		self.session   = session_factory() if session_factory else None  # Own session: commits never touch the caller's; disk tier is off without one
+		self.disk      = ThreadPoolExecutor(1, 'model-cache') if self.session else None  # The only thread using the session
+		self.disk_size = disk_size
+		self.writes    = 0
+		self.memory    = OrderedDict()  # key → (expires, JSON text of the response)
+		self.stats     = {
+			'memory_hits' : 0,
+			'disk_hits'   : 0,
+			'misses'      : 0,
+			'evictions'   : 0
+		}
+
+	############################################################################
+
+	@staticmethod
+	def make_key(
+		model_id    : str,
+		system      : str | None,
+		role        : str,
+		prompt      : str,
+		schema      : dict,
+		temperature : float
+	) -> str:
+		payload = json.dumps(
+			[model_id, system, role, prompt, schema, temperature],
+			sort_keys    = True,
+			ensure_ascii = False,
+			default      = str
+		)
+		return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+	def _is_expired(self, expires: float | None) -> bool:
+		return expires is not None and expires < time.time()
+
+	def _remember(self, key: str, expires: float | None, text: str):
+		self.memory[key] = (expires, text)
+		self.memory.move_to_end(key)
+		while len(self.memory) > self.size:
+			self.memory.popitem(last=False)
+			self.stats['evictions'] += 1
+
+	def _get_from_disk(self, key: str):
+		record = self.session.get(ModelCacheRecord, key)
+		if record is None:
+			return None
+
+		if self._is_expired(record.expires):
+			self.session.delete(record)
+			self.session.commit()
+			return None
+
+		return record.expires, json.dumps(record.response, ensure_ascii=False)
+
+	def _put_on_disk(self, key: str, model_id: str, expires: float | None, response: Any):
+		self.session.merge(ModelCacheRecord(
+			key      = key,
+			model_id = model_id,
+			response = response,
+			created  = time.time(),
+			expires  = expires
+		))
+		self.session.commit()
+
+		self.writes += 1
+		if self.writes % self.EVICT_EVERY == 0:
+			self._evict_from_disk()
+
+	def _evict_from_disk(self):
+		excess = self.session.query(ModelCacheRecord).count() - self.disk_size
+		if excess > 0:
+			oldest = self.session.query(ModelCacheRecord.key) \
+				.order_by(ModelCacheRecord.created)            \
+				.limit(excess)
+			self.session.query(ModelCacheRecord)                      \
+				.filter(ModelCacheRecord.key.in_(oldest.scalar_subquery())) \
+				.delete(synchronize_session=False)
+			self.session.commit()
+			self.stats['evictions'] += excess
+
+	def _clear_disk(self):
+		self.session.query(ModelCacheRecord).delete()
+		self.session.commit()
+
+	############################################################################
+
+	def _get_from_memory(self, key: str) -> Any:
+		entry = self.memory.get(key)
+		if entry is None:
+			return None
+		if self._is_expired(entry[0]):
+			del self.memory[key]
+			return None
+
+		self.memory.move_to_end(key)
+		self.stats['memory_hits'] += 1
+		return json.loads(entry[1])
+
+	def _found_on_disk(self, key: str, entry: tuple | None) -> Any:
+		if entry is None:
+			self.stats['misses'] += 1
+			return None
+
+		self._remember(key, *entry)
+		self.stats['disk_hits'] += 1
+		return json.loads(entry[1])
+
+	def _expire_from_now(self) -> float | None:
+		return time.time() + self.ttl if self.ttl else None
+
+	############################################################################
+
+	def get(self, key: str) -> Any:
+		result = self._get_from_memory(key)
+		if result is not None:
+			return result
+		if self.disk is None:
+			self.stats['misses'] += 1
+			return None
+		return self._found_on_disk(key, self.disk.submit(self._get_from_disk, key).result())
+
+	async def aget(self, key: str) -> Any:
+		result = self._get_from_memory(key)
+		if result is not None:
+			return result
+		if self.disk is None:
+			self.stats['misses'] += 1
+			return None
+		return self._found_on_disk(key, await asyncio.wrap_future(self.disk.submit(self._get_from_disk, key)))
+
+	def set(self, key: str, response: Any, model_id: str = ''):
+		expires = self._expire_from_now()
+		self._remember(key, expires, json.dumps(response, ensure_ascii=False))
+		if self.disk is not None:
+			self.disk.submit(self._put_on_disk, key, model_id, expires, response).result()
+
+	async def aset(self, key: str, response: Any, model_id: str = ''):
+		expires = self._expire_from_now()
+		self._remember(key, expires, json.dumps(response, ensure_ascii=False))
+		if self.disk is not None:
+			await asyncio.wrap_future(self.disk.submit(self._put_on_disk, key, model_id, expires, response))
+
+	def clear(self):
+		self.memory.clear()
+		if self.disk is not None:
+			self.disk.submit(self._clear_disk).result()
+
+	def to_dict(self) -> dict:
+		lookups = sum(v for k, v in self.stats.items() if k != 'evictions')
+		hits    = self.stats['memory_hits'] + self.stats['disk_hits']
+		return {
+			**self.stats,
+			'resident' : len(self.memory),
+			'hit_rate' : hits / lookups if lookups else 0.0
+		}
@@ -1,7 +1,8 @@
-import os
+import os, json, hashlib
+from types    import UnionType
 from typing   import Any, get_args, get_origin, Union, List, Dict
 
-from pydantic import BaseModel, Field, model_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator, create_model
 
 from .transform import T
 from .odb       import ODB
@@ -79,7 +80,70 @@ class O(BaseModel):
 
 	@classmethod
 	def to_schema(cls) -> dict:
-		return T(T.PYDANTIC, T.DEREFERENCED_JSONSCHEMA, cls)
+		'''Dereferenced JSON schema, built once per class. Shared: do not mutate.'''
+		schema = cls.__dict__.get('__schema__')
+		if schema is None:
+			schema = T(T.PYDANTIC, T.DEREFERENCED_JSONSCHEMA, cls)
+			cls.__schema__     = schema
+			cls.__schema_key__ = hashlib.sha256(json.dumps(schema, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+		return schema
+
+	@classmethod
+	def to_schema_key(cls) -> str:
+		'''Digest of `to_schema()`, stands in for the full schema in cache keys.'''
+		cls.to_schema()
+		return cls.__schema_key__
+
+	@classmethod
+	def to_plain_model(cls) -> type[BaseModel]:
+		'''
+		Plain BaseModel mirror of the class, nested O types included, built once per class.
+		Validates data without constructing O instances and their ODB. Keeps the
+		class config and its field and model validators; other methods are not copied.
+		'''
+		plain = cls.__dict__.get('__plain__')
+		if plain is None:
+			fields = {name: (O._to_plain_type(info.annotation), info) for name, info in cls.model_fields.items()}
+			plain  = cls.__plain__ = create_model(
+				cls.__name__,
+				__config__     = ConfigDict(**cls.model_config),
+				__validators__ = cls._get_validators(),
+				**fields
+			)
+		return plain
+
+	@classmethod
+	def _get_validators(cls) -> dict:
+		'''Field and model validators of the class and its bases, re-declared for create_model.'''
+		decorators = cls.__pydantic_decorators__
+		validators = {}
+
+		for name, decorator in decorators.field_validators.items():
+			info             = decorator.info
+			validators[name] = field_validator(*info.fields, mode=info.mode, check_fields=info.check_fields)(cls._get_raw_attribute(name))
+
+		for name, decorator in decorators.model_validators.items():
+			validators[name] = model_validator(mode=decorator.info.mode)(cls._get_raw_attribute(name))
+
+		return validators
+
+	@classmethod
+	def _get_raw_attribute(cls, name: str) -> Any:
+		'''Attribute as declared (classmethod, function), not as bound by attribute access.'''
+		return next(base.__dict__[name] for base in cls.__mro__ if name in base.__dict__)
+
+	@staticmethod
+	def _to_plain_type(tp: Any) -> Any:
+		if O.is_o_type(tp):
+			return tp.to_plain_model()
+
+		args = get_args(tp)
+		if args:
+			plain = tuple(O._to_plain_type(arg) for arg in args)
+			if plain != args:
+				origin = get_origin(tp)
+				return Union[plain] if origin in (Union, UnionType) else origin[plain]
+		return tp
 
 	@classmethod
 	def load(cls, ref: int | str) -> 'O':
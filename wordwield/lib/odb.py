@@ -1,18 +1,201 @@
-from sqlalchemy          import inspect
+import os, contextvars
+
+from contextlib          import contextmanager
+from sqlalchemy          import inspect, insert
 from sqlalchemy.orm      import Session
 
-from typing                    import get_origin, List, Dict
-from wordwield.lib.transform   import T
-from wordwield.lib.edge        import Edge
-from wordwield.db              import EdgeRecord
+from typing                     import get_origin, List, Dict
+from wordwield.lib.transform    import T
+from wordwield.lib.edge         import Edge
+from wordwield.lib.identity_map import IdentityMap
+from wordwield.db               import EdgeRecord
+
+
+def is_valid_edge_target(value) -> bool:
+	from wordwield.lib.o import O  # o.py imports this module
+	return O.is_o_instance(value)
+
+
+_unit  = contextvars.ContextVar('odb_unit',  default=None)
+_scope = contextvars.ContextVar('odb_scope', default=None)
+
+
+class UnitOfWork:
+	'''
+	Objects saved inside ODB.transaction(). On commit walks their reachable graph
+	once, writes rows in bulk per table, diffs and writes edges in bulk and
+	commits a single transaction.
+	'''
+
+	def __init__(self, session):
+		self.session = session
+		self.roots   = []  # (o, name) in save order
+
+	def add(self, o, name: str = None):
+		self.roots.append((o, name))
+
+	############################################################################
+
+	def _walk(self) -> tuple[list, list]:
+		'''Reachable objects, and (o, field, reverse, [(key, target)]) for every loaded relation field.'''
+		objects, relations, seen = [], [], set()
+		stack = [o for o, _ in reversed(self.roots)]
+
+		while stack:
+			o = stack.pop()
+			if id(o) in seen or o.db._is_deleted:
+				continue
+			seen.add(id(o))
+			objects.append(o)
+
+			for name, field in type(o).model_fields.items():
+				kind, _ = o.get_field_kind(name, field.annotation)
+				if kind is None or name not in o.__dict__:
+					continue  # Not a relation, or never loaded: its edges are left alone
+
+				value = o.__dict__[name]
+				if   kind == 'single' : items = [('', value)]
+				elif kind == 'list'   : items = [(str(i), item) for i, item in enumerate(value or [])]
+				else                  : items = [(str(k), item) for k, item in (value or {}).items()]
+
+				items   = [(key, item) for key, item in items if is_valid_edge_target(item) and not item.db._is_deleted]
+				reverse = (field.json_schema_extra or {}).get('reverse') or ''
+
+				relations.append((o, name, reverse, items))
+				stack.extend(item for _, item in reversed(items))
+
+		return objects, relations
+
+	def _write_rows(self, objects: list):
+		by_class = {}
+		for o in objects:
+			by_class.setdefault(type(o), []).append(o)
+
+		created = []
+		for o_class, items in by_class.items():
+			orm_class = ODB.get_orm_class(o_class)
+			ODB.ensure_table(orm_class)
+
+			existing = {}
+			for chunk in ODB._chunks([o.id for o in items if o.id is not None]):
+				for record in self.session.query(orm_class).filter(orm_class.id.in_(chunk)):
+					existing[record.id] = record
+
+			for o in items:
+				data = o.to_dict()
+				if o.id is None:
+					record = orm_class(**data)
+					self.session.add(record)
+					created.append((o, record))
+				else:
+					record = existing.get(o.id)
+					if record is None:
+						raise ValueError(f'Record with id={o.id} not found in table `{orm_class.__tablename__}`')
+					for key, value in data.items():
+						setattr(record, key, value)
+
+		self.session.flush()  # Batched INSERT / UPDATE per table, assigns new ids
+		for o, record in created:
+			o.__id__ = record.id
+
+	def _write_edges(self, relations: list):
+		edges   = Edge(self.session)
+		sources = {}
+		for o, *_ in relations:
+			sources.setdefault(type(o).__name__, set()).add(o.id)
+
+		existing = {}  # (type, id, rel) of either end → [(edge, side)], side 1 or 2 being that end
+		for type_name, ids in sources.items():
+			tid = edges.get_type_id(type_name)
+			if tid is None:
+				continue  # No edges touch this type yet
+			for chunk in ODB._chunks(list(ids)):
+				for edge in self.session.query(EdgeRecord).filter(EdgeRecord.id1.in_(chunk), EdgeRecord.tid1 == tid):
+					existing.setdefault((edge.type1, edge.id1, edge.rel1), []).append((edge, 1))
+				for edge in self.session.query(EdgeRecord).filter(EdgeRecord.id2.in_(chunk), EdgeRecord.tid2 == tid):
+					existing.setdefault((edge.type2, edge.id2, edge.rel2), []).append((edge, 2))
+
+		rows, pending, kept, unwanted = [], {}, set(), {}  # pending: (own end, other end) → rows to insert
+		for o, name, reverse, items in relations:
+			free = {}  # (type, id, rel, key) of the other end and this end's key → [(edge, side)]
+			for edge, side in existing.get((type(o).__name__, o.id, name), []):
+				if side == 1 : ident = (edge.type2, edge.id2, edge.rel2, edge.key1)
+				else         : ident = (edge.type1, edge.id1, edge.rel1, edge.key2)
+				free.setdefault(ident, []).append((edge, side))
+
+			missing = []
+			for key, target in items:
+				ident = (type(target).__name__, target.id, reverse, key)
+				if free.get(ident):
+					kept.add(free[ident].pop()[0].id)
+				else:
+					missing.append((key, target))
+
+			for key, target in missing:
+				end   = (type(target).__name__, target.id, reverse)
+				match = next((ident for ident, found in free.items() if ident[:3] == end and found), None)
+				if match:
+					edge, side = free[match].pop()
+					setattr(edge, f'key{side}', key)  # Same edge, possibly written from the other end: rekey it
+					kept.add(edge.id)
+					continue
+
+				own   = (type(o).__name__, o.id, name)
+				other = next((row for row in pending.get((end, own), []) if not row['key2']), None)
+				if other:
+					other['key2'] = key  # The other end already asked for this edge in this commit
+					continue
+
+				row = {
+					'id1'   : o.id,               'id2'   : target.id,
+					'type1' : type(o).__name__,   'type2' : type(target).__name__,
+					'tid1'  : edges.get_type_id(type(o).__name__, create=True),
+					'tid2'  : edges.get_type_id(type(target).__name__, create=True),
+					'rel1'  : name,               'rel2'  : reverse,
+					'key1'  : key,                'key2'  : ''
+				}
+				rows.append(row)
+				pending.setdefault((own, end), []).append(row)
+
+			for found in free.values():
+				unwanted.update((edge.id, edge) for edge, _ in found)
+
+		# An edge one end dropped but the other end still holds stays
+		stale = [edge_id for edge_id in unwanted if edge_id not in kept]
+		for chunk in ODB._chunks(stale):
+			self.session.query(EdgeRecord).filter(EdgeRecord.id.in_(chunk)).delete(synchronize_session=False)
+		if rows:
+			self.session.execute(insert(EdgeRecord), rows)
+
+	############################################################################
+
+	def commit(self):
+		objects, relations = self._walk()
 
+		self._write_rows(objects)
+		self._write_edges(relations)
+
+		for o, name in self.roots:
+			if name is not None:
+				o.db._set_name(name)
+
+		self.session.commit()
+
+		identity = ODB.identity()
+		for o in objects:
+			identity[(type(o), o.id)] = o
+		ODB._load_graph([o for o, _ in self.roots])  # Only fills relation fields that were never set
 
 
 class ODB:
 
-	session = None
-	types   = {}
-	objects = {}
+	session     = None
+	types       = {}
+	objects     = IdentityMap(int(os.environ.get('ODB_IDENTITY_SIZE', 10000)))  # Process-wide, used outside ODB.scope()
+	orm_classes = {}     # O class → its SQLAlchemy model, built once per class
+	tables      = set()  # ORM classes whose table is known to exist
+
+	IN_CHUNK    = 500  # Max ids per IN (...) clause, below SQLite's variable limit
 
 	# Class methods
 	################################################################################################
@@ -30,23 +213,22 @@ class ODB:
 		if isinstance(o_class, str):
 			o_class = cls.types[o_class]
 
-		key  = (o_class, id)
-		if key in cls.objects:
-			return cls.objects[key]
-		
-		o         = cls._preload(id, o_class)
-		o.__db__  = ODB(o)
-		o.__id__  = id
-
-		cls.objects[key] = o
+		o = cls.identity().get((o_class, id))
+		if o is not None:
+			return o
 
-		o.db._load_edges()
+		o = cls._preload_many(o_class, [id])[id]
+		cls._load_graph([o])
 		return o
 
 	@classmethod
 	def load_by_name(cls, name: str, o_class: 'O') -> 'O':
+		tid = Edge(cls.session).get_type_id('global')
+		if tid is None:
+			return None  # Nothing was ever named
+
 		record = cls.session.query(EdgeRecord).filter_by(
-			type1 = 'global',
+			tid1  = tid,
 			id1   = 0,
 			rel1  = 'ref',
 			key1  = name,
@@ -57,17 +239,206 @@ class ODB:
 		return None
 
 	@classmethod
-	def _preload(cls, id, o_class):
-		'''Loads simple data items and stubs for O, list[O] and dict[str, O]'''
-		orm_class = T(T.PYDANTIC, T.SQLALCHEMY_MODEL, o_class)
-		orm_obj   = cls.session.get(orm_class, id)
+	def get_orm_class(cls, o_class: type) -> type:
+		orm_class = cls.orm_classes.get(o_class)
+		if orm_class is None:
+			orm_class = cls.orm_classes[o_class] = T(T.PYDANTIC, T.SQLALCHEMY_MODEL, o_class)
+			cls.types.setdefault(o_class.__name__, o_class)  # Persisted: edges may name it. TypeService types win
+		return orm_class
+
+	@classmethod
+	def _resolve_type(cls, o, name: str, type_name: str) -> type:
+		'''Class of an object related through field `name`: the field's own class if the name matches, else a registered one.'''
+		field       = type(o).model_fields.get(name)
+		_, declared = o.get_field_kind(name, field.annotation) if field else (None, None)
+		if declared is not None and declared.__name__ == type_name:
+			return declared
+		return cls.types[type_name]
 
-		if not orm_obj:
-			raise ValueError(f'{o_class.__name__} with id={id} not found')
+	@classmethod
+	def ensure_table(cls, orm_class: type):
+		if orm_class not in cls.tables:
+			orm_class.__table__.create(cls.session.connection(), checkfirst=True)
+			cls.tables.add(orm_class)
 
-		data = T(T.SQLALCHEMY_MODEL, T.DATA, orm_obj)
-		data.pop('id')
-		return o_class.model_construct(**data)
+	@classmethod
+	@contextmanager
+	def transaction(cls):
+		'''
+		Groups saves into one unit of work, written and committed once on exit.
+		Objects saved inside get their ids on exit. Nested blocks join the outer one.
+		'''
+		unit = _unit.get()
+		if unit is not None:
+			yield unit
+			return
+
+		unit  = UnitOfWork(cls.session)
+		token = _unit.set(unit)
+		try:
+			yield unit
+			unit.commit()
+		except Exception:
+			cls.session.rollback()
+			raise
+		finally:
+			_unit.reset(token)
+
+	@classmethod
+	def identity(cls) -> IdentityMap:
+		'''Identity map of the current ODB.scope(), or the process-wide one.'''
+		scope = _scope.get()
+		return cls.objects if scope is None else scope
+
+	@classmethod
+	@contextmanager
+	def scope(cls, size: int = None):
+		'''
+		Own identity map for a request or pipeline run, released on exit. Objects
+		loaded inside are not shared with other scopes. Nested blocks join the outer one.
+		'''
+		if _scope.get() is not None:
+			yield _scope.get()
+			return
+
+		token = _scope.set(IdentityMap(cls.objects.size if size is None else size))
+		try:
+			yield _scope.get()
+		finally:
+			_scope.reset(token)
+
+	@classmethod
+	def evict(cls, o: 'O'):
+		'''Forgets `o`: the next load of its record builds a new object.'''
+		cls.identity().evict((type(o), o.id))
+
+	@classmethod
+	def clear(cls):
+		'''Forgets every loaded object of the current scope.'''
+		cls.identity().clear()
+
+	@classmethod
+	def stats(cls) -> dict:
+		return cls.identity().to_dict()
+
+	@classmethod
+	def _chunks(cls, ids: list) -> list:
+		return [ids[i:i + cls.IN_CHUNK] for i in range(0, len(ids), cls.IN_CHUNK)]
+
+	@classmethod
+	def _preload_many(cls, o_class, ids: list[int]) -> dict:
+		'''
+		Loads simple data items of `ids` with IN queries and registers them in the
+		identity map; relations are left unset. Returns them by id.
+		'''
+		orm_class = cls.get_orm_class(o_class)
+		identity  = cls.identity()
+		missing   = set(ids)
+		loaded    = {}
+
+		for chunk in cls._chunks(list(missing)):
+			for orm_obj in cls.session.query(orm_class).filter(orm_class.id.in_(chunk)):
+				data = T(T.SQLALCHEMY_MODEL, T.DATA, orm_obj)
+				data.pop('id')
+
+				o        = o_class.model_construct(**data)
+				o.__db__ = ODB(o)
+				o.__id__ = orm_obj.id
+
+				identity[(o_class, orm_obj.id)] = o
+				loaded[orm_obj.id] = o
+				missing.discard(orm_obj.id)
+
+		if missing:
+			raise ValueError(f'{o_class.__name__} with id={min(missing)} not found')
+		return loaded
+
+	@classmethod
+	def _load_graph(cls, frontier: list['O']):
+		'''
+		Fills unset relation fields of `frontier` and everything reachable from it,
+		level by level: one edge query per level and one IN query per table.
+		'''
+		identity = cls.identity()
+		seen     = set()
+
+		while frontier:
+			frontier = [o for o in frontier if (type(o), o.id) not in seen]
+			seen.update((type(o), o.id) for o in frontier)
+
+			pending = [(o, name) for o in frontier for name in type(o).model_fields if name not in o.__dict__]
+			if not pending:
+				break
+
+			# Edges touching the level, indexed by the (type, id) of either end
+			by_type = {}
+			for o, _ in pending:
+				by_type.setdefault(type(o).__name__, set()).add(o.id)
+			chunks = {type_name: cls._chunks(list(ids)) for type_name, ids in by_type.items()}
+
+			edges, fetched = {}, set()
+			for i in range(max(len(c) for c in chunks.values())):
+				batch = {type_name: c[i] for type_name, c in chunks.items() if i < len(c)}
+				for edge in Edge(cls.session).get_many(batch):
+					if edge.id in fetched:
+						continue  # Seen through its other end in an earlier batch
+					fetched.add(edge.id)
+					edges.setdefault((edge.type1, edge.id1), []).append(edge)
+					if (edge.type2, edge.id2) != (edge.type1, edge.id1):
+						edges.setdefault((edge.type2, edge.id2), []).append(edge)
+
+			# Related (type, id, key) per pending field, then rows for every target not loaded yet
+			related = {}
+			missing = {}
+			targets = {}  # (class, id) → o, held for this level so the map cannot drop them mid-load
+			for o, name in pending:
+				items = related[(id(o), name)] = [
+					(cls._resolve_type(o, name, type_name), target_id, key)
+					for type_name, target_id, key in cls._match_edges(o, name, edges.get((type(o).__name__, o.id), []))
+				]
+				for target_class, target_id, _ in items:
+					key = (target_class, target_id)
+					if key not in targets:
+						target = identity.get(key)
+						if target is None:
+							missing.setdefault(key[0], set()).add(target_id)
+						else:
+							targets[key] = target
+
+			for target_class, ids in missing.items():
+				for target_id, target in cls._preload_many(target_class, list(ids)).items():
+					targets[(target_class, target_id)] = target
+
+			frontier = []
+			for o, name in pending:
+				kind, _ = o.get_field_kind(name)
+				items   = [(targets[(target_class, target_id)], key) for target_class, target_id, key in related[(id(o), name)]]
+
+				if   kind == 'list' : value = [target for target, _ in sorted(items, key=lambda item: cls._list_position(item[1]))]
+				elif kind == 'dict' : value = {key: target for target, key in items}
+				else                : value = items[0][0] if items else None
+
+				setattr(o, name, value)
+				frontier += [target for target, _ in items]
+
+	@staticmethod
+	def _list_position(key: str) -> tuple:
+		'''Sort key of a list item by its stored index; items without one follow in edge order.'''
+		return (0, int(key)) if key.isdigit() else (1, 0)
+
+	@staticmethod
+	def _match_edges(o, name: str, edges: list) -> list[tuple]:
+		'''(type, id, key) of objects related to `o` through field `name`, forward or reverse.'''
+		type_name = type(o).__name__
+		result    = []
+
+		for edge in edges:
+			if edge.rel1 == name and edge.id1 == o.id and edge.type1 == type_name:
+				result.append((edge.type2, edge.id2, edge.key1))
+			elif edge.rel2 == name and edge.id2 == o.id and edge.type2 == type_name:
+				result.append((edge.type1, edge.id1, edge.key2))
+
+		return result
 
 	def _reload(self):
 		o     = self._o
@@ -85,8 +456,8 @@ class ODB:
 	def _reload_related(self):
 		o = self._o
 
-		for other in list(ODB.objects.values()):
-			if not isinstance(other, O): continue
+		for other in ODB.identity().values():
+			if not is_valid_edge_target(other): continue
 
 			for name, field in other.model_fields.items():
 				kind, _ = other.get_field_kind(name, field.annotation)
@@ -112,7 +483,7 @@ class ODB:
 
 	def __init__(self, instance: 'O'):
 		self._o          = instance
-		self._orm_class  = T(T.PYDANTIC, T.SQLALCHEMY_MODEL, type(instance))
+		self._orm_class  = ODB.get_orm_class(type(instance))
 		self._edge       = Edge(self.session)
 		self._is_deleted = False
 
@@ -126,71 +497,8 @@ class ODB:
 			return obj
 		return None
 
-	def _load_edges(self, seen=None):
-		o    = self._o
-		seen = seen or set()
-		key  = (type(o), o.id)
-
-		if key not in seen:
-			seen.add(key)
-			for name, field in o.model_fields.items():
-				if not name in o.__dict__:
-					value = self.get_related(name)
-					if value is None:
-						kind, _ = o.get_field_kind(name)
-						if   kind == 'list' : value = []
-						elif kind == 'dict' : value = {}
-						else                : value = None
-
-					setattr(o, name, value)
-					val = getattr(o, name)
-					if isinstance(val, list):
-						for item in val:
-							if hasattr(item, 'db'):
-								item.db._load_edges(seen)
-					elif hasattr(val, 'db'):
-						val.db._load_edges(seen)
-
-	def _save_edges(self):
-		o = self._o
-		s = self.session
-
-		for name, field in o.model_fields.items():
-			val         = getattr(o, name, None)
-			kind, inner = o.get_field_kind(name, field.annotation)
-			reverse     = field.json_schema_extra.get('reverse') if field.json_schema_extra else None
-
-			if kind == 'single' and is_valid_edge_target(val):
-				self._save_edge(src=o, tgt=val, rel1=name, rel2=reverse)
-
-			elif kind == 'list' and isinstance(val, list):
-				for i, item in enumerate(val):
-					self._save_edge(src=o, tgt=item, rel1=name, rel2=reverse, key1=str(i))
-
-			elif kind == 'dict' and isinstance(val, dict):
-				for k, item in val.items():
-					self._save_edge(src=o, tgt=item, rel1=name, rel2=reverse, key1=str(k))
-
-	def _save_edge(self, src, tgt, rel1, rel2, key1='', key2=''):
-		if (
-			O.is_o_instance(tgt)
-			and tgt.id is not None
-			and self.session.get(tgt.db._orm_class, tgt.id) is not None
-			and not getattr(tgt.db, '_is_deleted', False)
-		):
-			tgt.save()
-			if src.id is not None:
-				kwargs = {
-					'id1'  : src.id, 'id2'  : tgt.id,
-					'rel1' : rel1,   'rel2' : rel2,
-					'key1' : key1,   'key2' : key2,
-				}
-				if not self.edges.update(** kwargs):
-					self.edges.create(
-						** kwargs,
-						type1 = src.__class__.__name__,
-						type2 = tgt.__class__.__name__,
-					)
+	def _load_edges(self):
+		ODB._load_graph([self._o])
 
 	def _set_name(self, name: str):
 		if not self._o.id:
@@ -199,7 +507,7 @@ class ODB:
 		if name is None or self.get_name() == name:
 			return
 
-		if ODB.load_by_name(name, self.__class__):
+		if ODB.load_by_name(name, type(self._o)):
 			raise ValueError(f'❌ Name `{name}` already exists')
 
 		self.edges.set(
@@ -224,8 +532,8 @@ class ODB:
 	
 	def query(self)         : return self.session.query(self._orm_class)
 	def table_exists(self)  : return inspect(self.session.bind).has_table(self.table_name)
-	def create_table(self)  : self._orm_class.metadata.create_all(self.session.bind)
-	def drop_table(self)    : self._orm_class.metadata.drop_all(self.session.bind)
+	def create_table(self)  : self._orm_class.metadata.create_all(self.session.connection())  # Same connection: the session may hold the write lock
+	def drop_table(self)    : self._orm_class.metadata.drop_all(self.session.bind); ODB.tables.clear()
 	def filter(self, *args) : return self.query().filter(*args)
 	def get(self, id)       : return self._o_or_none(self.session.get(self._orm_class, id))
 	def first(self)         : return self._o_or_none(self.query().first())
@@ -235,52 +543,25 @@ class ODB:
 	def refresh(self)       : self.session.refresh(self._o)
 	def expunge(self)       : self.session.expunge(self._o)
 	def add(self)           : self.session.add(self._o)
-	def commit(self)        : self.create_table(); self.session.commit()
+	def commit(self)        : ODB.ensure_table(self._orm_class); self.session.commit()
 	def rollback(self)      : self.session.rollback()
 	def flush(self)         : self.session.flush()
 	def close(self)         : self.session.close()
 
 	def save(self, name=None):
-		data   = self._o.to_dict()
-		obj_id = getattr(self._o, '__id__', None)
-
-		self.create_table()
-
-		if obj_id:
-			# No need to check for existence – we assume id is valid
-			record = self.session.get(self._orm_class, obj_id)
-			if not record:
-				raise ValueError(f'Record with id={obj_id} not found in table `{self._orm_class.__tablename__}`')
-			for key, value in data.items():
-				setattr(record, key, value)
-		else:
-			record = self._orm_class(**data)
-			self.session.add(record)
-
-		self._save_edges()
-		self.commit()
-		setattr(self._o, '__id__', getattr(record, 'id', None))
-		self._load_edges()
-
-		if name is not None:
-			self._set_name(name)
-			self.commit()
-
+		with ODB.transaction() as unit:
+			unit.add(self._o, name)
 		return self
 
 	def delete(self):
-		id  = getattr(self._o, 'id', None)
-		typ = self._o.__class__.__name__
+		id = getattr(self._o, 'id', None)
 
 		if id is not None:
-			self.session.query(self.edges.model).filter(
-				((self.edges.model.id1 == id) & (self.edges.model.type1 == typ)) |
-				((self.edges.model.id2 == id) & (self.edges.model.type2 == typ))
-			).delete()
-
+			self.edges.delete_all(self._o)
 			self.query().filter(self._orm_class.id == id).delete()
+			ODB.evict(self._o)
 
-		self.commit()
+		self.session.commit()
 		self._is_deleted = True
 
 	def get_related(self, name: str):
@@ -290,10 +571,12 @@ class ODB:
 
 		for edge in edges:
 			if edge.rel1 == name and edge.id1 == o.id:
-				result.append(ODB.load(edge.id2, edge.type2))
+				result.append((edge.key1, ODB.load(edge.id2, ODB._resolve_type(o, name, edge.type2))))
 
 			elif edge.rel2 == name and edge.id2 == o.id:
-				result.append(ODB.load(edge.id1, edge.type1))
+				result.append((edge.key2, ODB.load(edge.id1, ODB._resolve_type(o, name, edge.type1))))
+
+		result = [item for _, item in sorted(result, key=lambda pair: ODB._list_position(pair[0]))]
 
 		# Detect result type by field shape
 		field = o.model_fields.get(name)
@@ -69,6 +69,9 @@ class Operator:
 	async def call(self, name, **kwargs):
 		return await self.globals['call'](name, *[], **kwargs)
 
+	async def call_many(self, calls, limit=None):
+		return await self.globals['call_many'](calls, limit=limit)
+
 	async def invoke(self):
 		'''Execute operator and return output.'''
 		raise NotImplementedError('Operator must implement invoke method')
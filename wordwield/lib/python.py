@@ -1,9 +1,15 @@
-import ast, types, linecache, builtins
+import ast, types, linecache, builtins, hashlib, contextvars
 from typing import Callable, Awaitable, Any, Dict, List, Optional
 from .execution_context import ExecutionContext
 
 
+# Per-invocation implementations of BOUND_GLOBALS, visible to cached operator classes
+_bindings = contextvars.ContextVar('python_bindings')
+
+
 class Python:
+	cache           = {}  # (name, code hash, restrict, operators version) → (globals, locals)
+	BOUND_GLOBALS   = ('call', 'call_many', 'ask', '_wrap_call_async')
 	BLOCKED_CALLS   = {'eval', 'exec', 'getattr', 'setattr', '__import__'}
 	BLOCKED_ATTRS   = {'__dict__', '__class__', '__globals__', '__code__'}
 	BLOCKED_GLOBALS = [
@@ -53,19 +59,34 @@ class Python:
 		registered_operators   : set,
 		extra_globals          : dict,
 		call_external_operator : Callable[[str, dict, ExecutionContext], Awaitable[Any]],
-		restrict               : bool = True
+		restrict               : bool = True,
+		version                : int  = 0,
+		type_classes           : dict = None
 	):
 		self.call_external_operator = call_external_operator
 		self.execution_context      = execution_context
 		self.registered_operators   = registered_operators
 		self.globals                = extra_globals
+		self.type_classes           = type_classes or {}
 		self.locals                 = {}
-		self.i                      = execution_context.i
 		self.restrict               = restrict
+		self.version                = version
 		self.filename               = f'<not set>'
 
 	############################################################################
 
+	@classmethod
+	def clear_cache(cls):
+		cls.cache.clear()
+
+	@staticmethod
+	def _trampoline(name):
+		def bound(*args, **kwargs):
+			return _bindings.get()[name](*args, **kwargs)
+		return bound
+
+	############################################################################
+
 	async def _initialize(self, entity_name, code):
 		self.env_stack = []
 		self.filename  = f'<{entity_name}>'
@@ -74,6 +95,29 @@ class Python:
 		compiled = self._compile(code)
 		exec(compiled, self.globals, self.locals)
 
+	def _materialize(self, entity_name, code):
+		'''
+		Compiles and executes entity code once per (name, code, restrict, operators version).
+		Cached classes see per-call `call`, `ask` and `_wrap_call_async` through trampolines.
+		'''
+		self.filename = f'<{entity_name}>'
+		self.bindings = {name: self.globals.get(name) for name in Python.BOUND_GLOBALS}
+		self.bindings['_wrap_call_async'] = self._wrap_call_async
+
+		key   = (entity_name, hashlib.sha1(code.encode()).hexdigest(), self.restrict, self.version)
+		entry = Python.cache.get(key)
+
+		if entry is None:
+			self.globals = dict(self.globals)
+			for name in Python.BOUND_GLOBALS:
+				self.globals[name] = Python._trampoline(name)
+
+			compiled = self._compile(code)
+			exec(compiled, self.globals, self.locals)
+			entry = Python.cache[key] = (self.globals, self.locals)
+
+		self.globals, self.locals = entry
+
 	############################################################################
 
 	def _apply_restrictions(self, tree):
@@ -104,23 +148,49 @@ class Python:
 
 	############################################################################
 
+	@staticmethod
+	def _referenced_names(tree: ast.AST) -> set[str]:
+		'''Names the code uses, including those inside string annotations like `'list[Beat]'`.'''
+		names = set()
+		for node in ast.walk(tree):
+			if isinstance(node, ast.Name):
+				names.add(node.id)
+			elif isinstance(node, ast.Constant) and isinstance(node.value, str):
+				try:
+					expression = ast.parse(node.value.strip(), mode='eval')
+				except (SyntaxError, ValueError):
+					continue  # Plain text, not a forward reference
+				names |= Python._referenced_names(expression)
+		return names
+
+	def _inject_types(self, tree: ast.AST):
+		'''Adds to globals only the type classes the code actually references.'''
+		if self.type_classes:
+			for name in self._referenced_names(tree):
+				if name in self.type_classes and name not in self.globals:
+					self.globals[name] = self.type_classes[name]
+
 	def _compile(self, code: str) -> types.CodeType:
 		tree = ast.parse(code, filename=self.filename)
+		self._inject_types(tree)
 
 		if self.restrict:
 			self._apply_restrictions(tree)
 
 		class CallRewriter(ast.NodeTransformer):
-			def __init__(self, globals, registered_operators):
+			def __init__(self, globals, registered_operators, restrict):
 				super().__init__()
 				self.globals              = globals
 				self.registered_operators = registered_operators
+				self.restrict             = restrict
 
 			def visit_Call(self, node: ast.Call) -> ast.AST:
 				self.generic_visit(node)
 				if isinstance(node.func, ast.Name):
 					if node.func.id in self.globals:
 						return node # skip rewriting known globals like call, ask, print
+					if not self.restrict and hasattr(builtins, node.func.id):
+						return node # unrestricted code runs with the real builtins
 
 					if not node.func.id in self.registered_operators:
 						raise NameError(f'Unknown identifier `{node.func.id}`: is not in globals and not a registered operator')
@@ -141,7 +211,7 @@ class Python:
 				return node
 
 		# 🔧 применяем AST преобразования
-		tree = CallRewriter(self.globals, self.registered_operators).visit(tree)
+		tree = CallRewriter(self.globals, self.registered_operators, self.restrict).visit(tree)
 		ast.fix_missing_locations(tree)
 
 		# 🔥 добавляем код в linecache под псевдо-именем
@@ -173,8 +243,9 @@ class Python:
 		input_dict             : dict,
 		code                   : str,
 	):
-		await self._initialize(operator_name, code)
+		self._materialize(operator_name, code)
 		self.execution_context.push(operator_name, 1, 'restricted' if self.restrict else 'unrestricted')
+		token = _bindings.set(self.bindings)
 		try:
 			operator_class = self.locals.get(operator_class_name)
 			if not operator_class:
@@ -187,6 +258,7 @@ class Python:
 
 			return await invoke_method(**input_dict)
 		finally:
+			_bindings.reset(token)
 			self.execution_context.pop()
 
 	############################################################################
@@ -0,0 +1,156 @@
+import os, json, collections
+
+from typing     import Any, NamedTuple
+
+from .string    import String
+from .highlight import Highlight
+
+
+class TraceEvent(NamedTuple):
+	kind       : str    # 'push' or 'pop'
+	name       : str
+	depth      : int
+	restrict   : bool
+	lineno     : int
+	line       : str
+	importance : float
+	timestamp  : float  # Wall clock time of frame start
+	duration   : float  # Seconds spent in frame, 0 on push
+	detail     : Any    # Rendered lazily with `TraceSink.render_detail`
+
+
+class TraceSink:
+	'''Receives trace events from ExecutionContext. Rendering happens only inside sinks.'''
+
+	enabled = True
+
+	@staticmethod
+	def render_detail(detail: Any) -> str:
+		if detail is None:
+			return ''
+		if callable(detail):
+			detail = detail()
+		return detail if isinstance(detail, str) else str(detail)
+
+	def record(self, event: TraceEvent):
+		raise NotImplementedError('TraceSink must implement record method')
+
+	def flush(self):
+		'''Called once a request is done; sinks that buffer write out here.'''
+		pass
+
+
+class NullSink(TraceSink):
+	'''Drops everything; ExecutionContext skips building events for it.'''
+
+	enabled = False
+
+	def record(self, event: TraceEvent):
+		pass
+
+
+class RingSink(TraceSink):
+	'''Keeps the last `size` events in memory.'''
+
+	def __init__(self, size: int = 1000):
+		self.events = collections.deque(maxlen=size)
+
+	def record(self, event: TraceEvent):
+		self.events.append(event)
+
+	def to_list(self) -> list[dict]:
+		return [
+			{ **event._asdict(), 'detail': self.render_detail(event.detail) }
+			for event in self.events
+		]
+
+	def clear(self):
+		self.events.clear()
+
+
+class JsonlSink(TraceSink):
+	'''Appends one JSON object per event to a file, written out on `flush`.'''
+
+	def __init__(self, path: str):
+		if os.path.dirname(path):
+			os.makedirs(os.path.dirname(path), exist_ok=True)
+		self.path = path
+		self.file = open(path, 'a', encoding='utf-8')
+
+	def record(self, event: TraceEvent):
+		data = { **event._asdict(), 'detail': self.render_detail(event.detail) }
+		self.file.write(json.dumps(data, ensure_ascii=False, default=str) + '\n')
+
+	def flush(self):
+		self.file.flush()
+
+	def close(self):
+		self.file.close()
+
+
+class ConsoleSink(TraceSink):
+	'''Prints colored, indented frame lines, as ExecutionContext always did.'''
+
+	def __init__(self, enable_color: bool = True, enable_code: bool = True):
+		self.enable_color = enable_color
+		self.enable_code  = enable_code
+		self.indent_text  = String.color(String.color(' ', String.GRAY), String.LIGHTGRAY) if enable_color else ' '
+
+	#################################################################
+
+	def _get_code(self, event):
+		if self.enable_code and event.line:
+			code = event.line.strip() + '\n'
+			if self.enable_color:
+				code = Highlight.python(code).replace('\n', '')
+			return code
+		return ''
+
+	def _get_block_icon(self, event):
+		if not self.enable_color:
+			return '▮'
+		color = String.RED if event.restrict else String.GREEN
+		return String.color('▮', color)
+
+	def _get_detail(self, detail=''):
+		if self.enable_color:
+			detail = String.color(detail, String.GRAY, 'i')
+		return detail
+
+	def _get_direction(self, is_push):
+		direction = '→' if is_push else '←'
+		if self.enable_color:
+			color = String.GREEN if is_push else String.RED
+			direction = String.color(direction, color)
+		return direction
+
+	def _get_line(self, event):
+		icon      = self._get_block_icon(event)
+		code      = self._get_code(event)
+		detail    = self._get_detail(self.render_detail(event.detail))
+		direction = self._get_direction(event.kind == 'push')
+		left      = f'{icon}{self.indent_text * event.depth} {direction} {event.name} :'
+		return    f'{left} {code}{detail}'
+
+	#################################################################
+
+	def record(self, event: TraceEvent):
+		print(self._get_line(event))
+
+
+def create_sink(spec: str = 'console') -> TraceSink:
+	'''
+	Builds a sink from a spec like the TRACE_SINK setting:
+	`console`, `null`, `ring` or `ring:<size>`, `jsonl:<path>`.
+	'''
+	kind, _, arg = (spec or 'console').partition(':')
+	kind         = kind.strip().lower()
+
+	if kind == 'console' : return ConsoleSink()
+	if kind == 'null'    : return NullSink()
+	if kind == 'ring'    : return RingSink(int(arg)) if arg else RingSink()
+	if kind == 'jsonl':
+		if not arg:
+			raise ValueError('Trace sink `jsonl` needs a path: `jsonl:<path>`')
+		return JsonlSink(arg)
+	raise ValueError(f'Unknown trace sink `{spec}`: expected console, null, ring[:size] or jsonl:<path>')
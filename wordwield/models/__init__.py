@@ -1,2 +1,3 @@
 from .model_ollama import ModelOllama
-from .model_openai import ModelOpenai
\ No newline at end of file
+from .model_openai import ModelOpenai
+from .model_mock   import ModelMock
@@ -0,0 +1,129 @@
+import os
+import json
+import random
+import asyncio
+from urllib.parse import parse_qsl
+
+from lib import Model
+
+
+class ModelMock(Model):
+	'''
+	Local stand-in provider for load tests: synthesizes JSON that conforms to the
+	response schema after a simulated latency, and fails at a configured rate.
+
+	Defaults come from MOCK_* env vars and can be overridden per model id:
+	`mock::echo?latency=0.5&dist=lognormal&spread=0.2&failure_rate=0.01`
+
+	dist: fixed, uniform (latency ± spread), normal, lognormal (spread is sigma), exponential
+	'''
+
+	concurrency = int(os.environ.get('MOCK_CONCURRENCY', 64))
+
+	def __init__(self, name: str = 'echo'):
+		name, _, query = name.partition('?')
+		super().__init__(name)
+
+		options           = dict(parse_qsl(query))
+		self.latency      = float(options.get('latency',      os.environ.get('MOCK_LATENCY',      0)))
+		self.spread       = float(options.get('spread',       os.environ.get('MOCK_SPREAD',       0)))
+		self.dist         = options.get('dist',               os.environ.get('MOCK_DIST',         'fixed'))
+		self.failure_rate = float(options.get('failure_rate', os.environ.get('MOCK_FAILURE_RATE', 0)))
+		self.random       = random.Random(options.get('seed', os.environ.get('MOCK_SEED')) or None)
+		self.calls        = 0
+		self.failures     = 0
+
+	# Simulation
+	############################################################################
+
+	def _get_latency(self) -> float:
+		mean, spread = self.latency, self.spread
+
+		if   self.dist == 'uniform'     : value = self.random.uniform(mean - spread, mean + spread)
+		elif self.dist == 'normal'      : value = self.random.gauss(mean, spread)
+		elif self.dist == 'lognormal'   : value = mean * self.random.lognormvariate(0, spread)
+		elif self.dist == 'exponential' : value = self.random.expovariate(1 / mean) if mean else 0
+		else                            : value = mean
+
+		return max(value, 0.0)
+
+	def _should_fail(self) -> bool:
+		failing        = bool(self.failure_rate) and self.random.random() < self.failure_rate
+		self.failures += failing
+		return failing
+
+	def _fail(self):
+		raise ValueError(f'ModelMock `{self.name}` injected failure')
+
+	def _synthesize(self, schema: dict, prompt: str, name: str = 'value'):
+		'''Builds a value for `schema`. Deterministic for a given prompt.'''
+		if 'const' in schema : return schema['const']
+		if 'enum'  in schema : return schema['enum'][len(prompt) % len(schema['enum'])]
+
+		options = schema.get('anyOf') or schema.get('oneOf')
+		if options:
+			options = [o for o in options if o.get('type') != 'null'] or options
+			return self._synthesize(options[0], prompt, name)
+
+		kind = schema.get('type', 'string')
+		if isinstance(kind, list):
+			kind = next((k for k in kind if k != 'null'), 'null')
+
+		if kind == 'object':
+			return {
+				key: self._synthesize(sub, prompt, key)
+				for key, sub in schema.get('properties', {}).items()
+			}
+		if kind == 'array':
+			count = max(schema.get('minItems', 2), 1)
+			count = min(count, schema.get('maxItems', count))
+			return [self._synthesize(schema.get('items', {}), prompt, name) for _ in range(count)]
+		if kind == 'integer':
+			return max(schema.get('minimum', 0), min(len(prompt), schema.get('maximum', len(prompt))))
+		if kind == 'number':
+			return float(max(schema.get('minimum', 0), min(len(prompt), schema.get('maximum', len(prompt)))))
+		if kind == 'boolean':
+			return len(prompt) % 2 == 0
+		if kind == 'null':
+			return None
+
+		return f'{name}: {prompt[:64]}'
+
+	# Public
+	############################################################################
+
+	async def __call__(
+		self,
+		prompt          : str,
+		response_schema : dict,
+		role            : str = 'user',
+		temperature     : float = 0.0,
+		system          : str | None = None
+	) -> str:
+		self.calls += 1
+		async with self.get_semaphore():
+			await asyncio.sleep(self._get_latency())
+		if self._should_fail():
+			self._fail()
+		return json.dumps(self._synthesize(response_schema, prompt), ensure_ascii=False)
+
+	async def stream(
+		self,
+		prompt          : str,
+		response_schema : dict,
+		role            : str = 'user',
+		temperature     : float = 0.0,
+		system          : str | None = None
+	):
+		self.calls += 1
+		text   = json.dumps(self._synthesize(response_schema, prompt), ensure_ascii=False)
+		chunks = [text[i:i + 16] for i in range(0, len(text), 16)]
+		delay  = self._get_latency() / len(chunks)
+		fail   = len(chunks) // 2 if self._should_fail() else None  # Fails mid-stream
+
+		async with self.get_semaphore():
+			for i, chunk in enumerate(chunks):
+				if i == fail:
+					self._fail()
+				await asyncio.sleep(delay)
+				yield chunk
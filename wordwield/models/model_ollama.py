@@ -1,7 +1,7 @@
+import os
 import re
 import json
 import codecs
-import asyncio
 import ollama
 from pydantic import BaseModel
 
@@ -9,9 +9,13 @@ from lib import Model
 
 
 class ModelOllama(Model):
+	concurrency = int(os.environ.get('OLLAMA_CONCURRENCY', 4))
+	client      = None  # Shared ollama.AsyncClient, keeps its connection pool alive
+
 	def __init__(self, name: str):
-		self.name   = name
-		self.client = ollama
+		super().__init__(name)
+		if ModelOllama.client is None:
+			ModelOllama.client = ollama.AsyncClient()
 
 	def _strip_schema(self, schema: dict) -> dict:
 		'''Clean JSON Schema for Ollama compatibility.'''
@@ -39,24 +43,30 @@ class ModelOllama(Model):
 			return output
 
 
-	async def __call__(
+	def sanitize(self, text: str) -> str:
+		return self._sanitize_output(text)
+
+	def decode(self, output: str | dict, response_model: type) -> dict:
+		# Raw byte tokens are valid JSON, so strict decode would keep them
+		if isinstance(output, str) and '<0x' in output:
+			output = self.sanitize(output)
+		return super().decode(output, response_model)
+
+	def _get_params(
 		self,
 		prompt          : str,
 		response_schema : dict,
-		role            : str = 'user',
-		temperature     : float = 0.0,
-		system          : str | None = None
+		role            : str,
+		temperature     : float,
+		system          : str | None
 	) -> dict:
-		# print('='*30)
-		# print(response_schema)
-		# print('='*30)
 		params = {
 			'model'    : self.name,
 			'messages' : [{
 				'role'    : role,
 				'content' : prompt
 			}],
-			'format'  : self._strip_schema(response_schema),
+			'format'  : self.get_format(response_schema, self._strip_schema),
 			'options' : {
 				'temperature' : temperature,
 				'keep_alive'  : 60
@@ -66,13 +76,42 @@ class ModelOllama(Model):
 		if system:
 			params['messages'].insert(0, {'role': 'system', 'content': system})
 
+		return params
+
+	async def __call__(
+		self,
+		prompt          : str,
+		response_schema : dict,
+		role            : str = 'user',
+		temperature     : float = 0.0,
+		system          : str | None = None
+	) -> str:
+		# print('='*30)
+		# print(response_schema)
+		# print('='*30)
+		params = self._get_params(prompt, response_schema, role, temperature, system)
+
 		print('⏳ Calling ollama.chat...')
-		response = await asyncio.to_thread(self.client.chat, **params)
+		async with self.get_semaphore():
+			response = await self.client.chat(**params)
 		print('✅ ollama.chat returned!')
-		text      = response['message']['content']
+		text = response['message']['content']
 		print('-' * 30)
 		print('OUTPUT', text)
 		print('-' * 30)
-		sanitized = self._sanitize_output(text)
 
-		return json.loads(sanitized)
+		return text
+
+	async def stream(
+		self,
+		prompt          : str,
+		response_schema : dict,
+		role            : str = 'user',
+		temperature     : float = 0.0,
+		system          : str | None = None
+	):
+		params = self._get_params(prompt, response_schema, role, temperature, system)
+
+		async with self.get_semaphore():
+			async for chunk in await self.client.chat(**params, stream=True):
+				yield chunk['message']['content']
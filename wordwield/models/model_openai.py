@@ -1,18 +1,21 @@
-import json
-import asyncio
-from openai import OpenAI
+import os
+from openai import AsyncOpenAI
 
 from lib import Model
 
 
 class ModelOpenai(Model):
+	concurrency = int(os.environ.get('OPENAI_CONCURRENCY', 16))
+	client      = None  # Shared AsyncOpenAI, keeps its connection pool alive
+
 	def __init__(self, name='gpt-4o'):
 		super().__init__(name)
-		self.client = OpenAI()
+		if ModelOpenai.client is None:
+			ModelOpenai.client = AsyncOpenAI()
 
 	def to_json_schema(self, schema):
-		schema                         = super().to_json_schema(schema)
 		schema_name                    = f'{self.__class__.__name__.lower()}_response_schema'
+		schema                         = dict(schema)  # Shared schema from O.to_schema, do not mutate
 		schema['type']                 = 'object'
 		schema['additionalProperties'] = False
 
@@ -24,33 +27,57 @@ class ModelOpenai(Model):
 			}
 		}
 
-	async def __call__(
+	def _get_params(
 		self,
 		prompt          : str,
 		response_schema : type,
-		role            : str = 'user',
-		temperature     : float = 0.0,
-		system          : str | None = None
+		role            : str,
+		temperature     : float,
+		system          : str | None
 	) -> dict:
 		messages = []
 		if system:
 			messages.append({'role': 'system', 'content': system})
 		messages.append({'role': role, 'content': prompt})
 
-		params = {
+		return {
 			'model'           : self.name,
 			'temperature'     : temperature,
-			'response_format' : self.to_json_schema(response_schema),
+			'response_format' : self.get_format(response_schema, self.to_json_schema),
 			'messages'        : messages
 		}
 
+	async def __call__(
+		self,
+		prompt          : str,
+		response_schema : type,
+		role            : str = 'user',
+		temperature     : float = 0.0,
+		system          : str | None = None
+	) -> str:
+		params = self._get_params(prompt, response_schema, role, temperature, system)
+
+		try:
+			async with self.get_semaphore():
+				response = await self.client.chat.completions.create(**params)
+			return response.choices[0].message.content
+		except Exception as e:
+			raise ValueError(f'OpenAIModel LLM communication error: {e}')
+
+	async def stream(
+		self,
+		prompt          : str,
+		response_schema : type,
+		role            : str = 'user',
+		temperature     : float = 0.0,
+		system          : str | None = None
+	):
+		params = self._get_params(prompt, response_schema, role, temperature, system)
+
 		try:
-			response = await asyncio.to_thread(
-				self.client.chat.completions.create,
-				**params
-			)
-			return json.loads(response.choices[0].message.content)
-		except json.JSONDecodeError as e:
-			raise ValueError(f'OpenAIModel JSON parsing error: {e}')
+			async with self.get_semaphore():
+				async for chunk in await self.client.chat.completions.create(**params, stream=True):
+					if chunk.choices and chunk.choices[0].delta.content:
+						yield chunk.choices[0].delta.content
 		except Exception as e:
 			raise ValueError(f'OpenAIModel LLM communication error: {e}')
@@ -1,19 +1,19 @@
-from pydantic     import BaseModel
-from typing       import Any
-from lib.operator import Operator
+from typing import Any
+from lib    import Operator, O
 
 
 class Recursor(Operator):
 	'''Recursively calls an operator and builds a tree structure using its list output.''' 
 
-	class InputType(BaseModel):
+	class InputType(O):
 		generator_name  : str
 		generator_input : dict
 		depth           : int
 		spread          : int
 		breadcrumbs     : list[str] = None
+		parallel        : bool      = False
 
-	class OutputType(BaseModel):
+	class OutputType(O):
 		value : dict
 
 	async def invoke(
@@ -22,7 +22,8 @@ class Recursor(Operator):
 		generator_input : dict,
 		depth           : int       = 1,
 		spread          : int       = 1,
-		breadcrumbs     : list[str] = None
+		breadcrumbs     : list[str] = None,
+		parallel        : bool      = False
 	):
 		breadcrumbs = breadcrumbs or []
 		breadcrumbs = breadcrumbs.copy()
@@ -37,7 +38,22 @@ class Recursor(Operator):
 
 			breadcrumbs.append(generator_input['item'])
 
-			if depth > 1:
+			if depth > 1 and parallel:
+				# Expand the whole level concurrently, results keep item order
+				result_items = await call_many([
+					('recursor', {
+						'generator_name'  : generator_name,
+						'generator_input' : { **generator_input, 'item': item, 'breadcrumbs': breadcrumbs },
+						'depth'           : depth-1,
+						'spread'          : spread,
+						'breadcrumbs'     : breadcrumbs,
+						'parallel'        : parallel
+					})
+					for item in call_result
+				])
+				for item, result_item in zip(call_result, result_items):
+					result['out'].append({'in': item, 'out': result_item['out']})
+			elif depth > 1:
 				for item in call_result:
 					new_generator_input = {
 						**generator_input,     # сохраняем все старые ключи
@@ -49,7 +65,8 @@ class Recursor(Operator):
 						generator_input = new_generator_input,
 						depth           = depth-1,
 						spread          = spread,
-						breadcrumbs     = breadcrumbs
+						breadcrumbs     = breadcrumbs,
+						parallel        = parallel
 					)
 					result['out'].append({'in': item, 'out': result_item['out']})
 			else:
@@ -3,7 +3,7 @@ from __future__ import annotations
 import os
 from typing import Any
 
-from wordwield.lib  import DapiException, DapiService, is_reserved, Module, String, Operator
+from wordwield.lib  import DapiException, DapiService, is_reserved, Module, String, Operator, Python, Binder
 
 from wordwield.db      import OperatorRecord
 from wordwield.schemas import OperatorSchema
@@ -15,16 +15,59 @@ OPERATOR_DIR = os.path.join(
 )
 
 
+class OperatorDefinition:
+	'''In-memory snapshot of an OperatorRecord with precomputed input/output fields.'''
+
+	def __init__(self, data: dict):
+		self.data        = data
+		self.name        = data['name']
+		self.class_name  = data['class_name']
+		self.description = data.get('description') or ''
+		self.code        = data.get('code')
+		self.restrict    = data.get('restrict', True)
+		self.input_type  = data['input_type']
+		self.output_type = data['output_type']
+		self.scope       = data.get('scope')  or {}
+		self.config      = data.get('config') or {}
+
+		self.input_fields    = list(self.input_type.get('properties', {}).keys())
+		self.input_required  = set(self.input_type.get('required', []))
+		self.output_fields   = list(self.output_type.get('properties', {}).keys())
+		self.binder          = Binder(self.name, self.input_fields, self.input_required, self.output_fields)
+
+	def to_dict(self) -> dict:
+		return dict(self.data)
+
+
 @DapiService.wrap_exceptions()
 class DefinitionService(DapiService):
 	'''Stores and manages operator definitions, including plugin loading and schema validation.'''
 
+	def __init__(self, dapi):
+		super().__init__(dapi)
+		self.version  = 0     # Bumped whenever the set of operator definitions changes
+		self.registry = None  # name → OperatorDefinition, loaded from db on first use
+
 	async def initialize(self):
 		await super().initialize()
 		await self.register_plugin_operators()
 
 	############################################################################
 
+	def _changed(self):
+		self.version += 1
+		Python.clear_cache()
+
+	def _get_registry(self) -> dict[str, OperatorDefinition]:
+		if self.registry is None:
+			self.registry = {
+				op.name: OperatorDefinition(op.to_dict())
+				for op in self.dapi.db.query(OperatorRecord).all()
+			}
+		return self.registry
+
+	############################################################################
+
 	def validate_name(self, name: str) -> None:
 		if is_reserved(name):
 			raise DapiException(
@@ -33,21 +76,23 @@ class DefinitionService(DapiService):
 				severity    = DapiException.HALT
 			)
 
-	def require(self, name: str) -> OperatorRecord:
-		op = self.dapi.db.get(OperatorRecord, name)
+	def require(self, name: str) -> OperatorDefinition:
+		op = self._get_registry().get(name)
 		if not op:
 			raise DapiException(
 				status_code = 404,
 				detail      = f'Operator `{name}` does not exist',
 				severity    = DapiException.HALT
 			)
-		op.config = op.config or {}
 		return op
 
 	############################################################################
 
 	def exists(self, name: str) -> bool:
-		return bool(self.dapi.db.get(OperatorRecord, name))
+		return name in self._get_registry()
+
+	def get_names(self):
+		return self._get_registry().keys()
 
 	async def create(self, schema: OperatorSchema, replace=False) -> bool:
 		self.validate_name(schema.name)
@@ -55,24 +100,33 @@ class DefinitionService(DapiService):
 		if self.exists(schema.name) and replace:
 			await self.delete(schema.name)
 
-		record = OperatorRecord(**schema.model_dump())
+		data   = schema.model_dump()
+		record = OperatorRecord(**data)
 		self.dapi.db.add(record)
 		self.dapi.db.commit()
+
+		self._get_registry()[schema.name] = OperatorDefinition(data)
+		self._changed()
 		return schema.name
 
 	async def get(self, name: str) -> dict:
 		return self.require(name).to_dict()
 
 	async def get_all(self) -> list[dict]:
-		return [op.to_dict() for op in self.dapi.db.query(OperatorRecord).all()]
+		return [op.to_dict() for op in self._get_registry().values()]
 
 	async def get_operator_sources(self) -> list[str]:
 		return [op['name'] for op in await self.get_all()]
 
 	async def delete(self, name: str) -> None:
-		record = self.require(name)
-		self.dapi.db.delete(record)
-		self.dapi.db.commit()
+		self.require(name)
+		record = self.dapi.db.get(OperatorRecord, name)
+		if record:
+			self.dapi.db.delete(record)
+			self.dapi.db.commit()
+
+		self._get_registry().pop(name, None)
+		self._changed()
 
 	async def delete_all(self) -> None:
 		'''Delete all restricted operators.'''
@@ -81,6 +135,9 @@ class DefinitionService(DapiService):
 				.filter(OperatorRecord.restrict.is_(True)) \
 				.delete(synchronize_session=False)
 			self.dapi.db.commit()
+
+			self.registry = None
+			self._changed()
 		except Exception as e:
 			if 'database is locked' in str(e):
 				raise RuntimeError('❌ SQLite database is locked. Close other connections or wait.')
@@ -1,5 +1,5 @@
 from __future__ import annotations
-import random, json, aiofiles
+import os, random, json, asyncio, aiofiles, contextlib, contextvars
 
 from typing   import Any, Dict, List, Optional
 from pydantic import BaseModel
@@ -20,26 +20,69 @@ from wordwield.lib import (
 from wordwield.schemas import OperatorSchema
 
 
+CALL_MANY_LIMIT = int(os.environ.get('CALL_MANY_LIMIT', 8))
+
+
+class _Permit:
+	'''
+	Slot of the context-wide call_many limiter, held by one running call. The call
+	gives it back while any of its own call_many fan-outs is waiting, and takes it
+	again once the last one is done.
+	'''
+
+	def __init__(self, limiter: asyncio.Semaphore):
+		self.limiter = limiter
+		self.held    = False
+		self.waiting = 0             # Fan-outs of this call currently waiting on their children
+		self.lock    = asyncio.Lock()  # One re-acquire at a time
+
+	async def acquire(self):
+		await self.limiter.acquire()
+		self.held = True
+
+	def release(self):
+		if self.held:
+			self.held = False
+			self.limiter.release()
+
+	def suspend(self):
+		self.waiting += 1
+		self.release()
+
+	async def resume(self):
+		self.waiting -= 1
+		async with self.lock:
+			if not self.waiting and not self.held:
+				await self.acquire()
+				if self.waiting:
+					self.release()  # Another fan-out started while this one waited for the slot
+
+
+_permit = contextvars.ContextVar('call_many_permit', default=None)  # Permit of the call running in this task
+
+
 @DapiService.wrap_exceptions()
 class RuntimeService(DapiService):
 	'''Handles execution of operators: input/output packing, invocation, context tracing.'''
 
+	BASE_GLOBALS = {
+		'Operator'     : Operator,
+		'Agent'        : Agent,
+		'Expert'       : Expert,
+
+		'O'            : O,
+		'String'       : String,
+
+		'BaseModel'    : BaseModel,
+		'random'       : random,
+		'json'         : json,
+		'aiofiles'     : aiofiles,
+	}
+
 	############################################################################
 
 	def get_globals(self, context=None, type_classes=None):
-		operator_globals = {
-			'Operator'     : Operator,
-			'Agent'        : Agent,
-			'Expert'       : Expert,
- 
-			'O'            : O,
-			'String'       : String,
-
-			'BaseModel'    : BaseModel,
-			'random'       : random,
-			'json'         : json,
-			'aiofiles'     : aiofiles,
-		}
+		operator_globals = dict(RuntimeService.BASE_GLOBALS)
 
 		#-----------------------------------------------------------------#
 		async def _call(name, *args, **kwargs):
@@ -56,6 +99,15 @@ class RuntimeService(DapiService):
 
 		operator_globals['call'] = _call
 		#-----------------------------------------------------------------#
+		async def _call_many(calls, limit=None):
+			return await self.call_many(
+				calls    = calls,
+				context  = context,
+				limit    = limit
+			)
+
+		operator_globals['call_many'] = _call_many
+		#-----------------------------------------------------------------#
 		async def _ask(
 			prompt,
 			response_model,
@@ -63,12 +115,19 @@ class RuntimeService(DapiService):
 			model_id    = 'ollama::gemma3:4b',
 			temperature = 0.0
 		):
-			return await Model.generate(
-				prompt          = prompt,
-				response_model  = response_model,
-				model_id        = model_id,
-				temperature     = temperature
-			)
+			if context is not None:
+				context.push(name=model_id, kind='llm')
+			try:
+				return await Model.generate(
+					prompt          = prompt,
+					response_model  = response_model,
+					model_id        = model_id,
+					temperature     = temperature,
+					stream          = context.stream if context is not None else None
+				)
+			finally:
+				if context is not None:
+					context.pop()
 
 		operator_globals['ask'] = _ask
 		#-----------------------------------------------------------------#
@@ -81,9 +140,8 @@ class RuntimeService(DapiService):
 	############################################################################
 
 	async def get_registered_operator_names(self) -> set[str]:
-		'''Returns a set of all registered operator names.'''
-		operators = await self.dapi.definition_service.get_all()
-		return {op['name'] for op in operators}
+		'''Returns a live view of all registered operator names.'''
+		return self.dapi.definition_service.get_names()
 
 	async def call_external_operator(self, name: str, args: list, kwargs: dict, context: ExecutionContext) -> Any:
 		'''External operator call from interpreted code.'''
@@ -92,15 +150,64 @@ class RuntimeService(DapiService):
 		result      = await self.unwrap_output(name, output_dict)    # Step 3: Unpack output to tuple
 		return result
 
+	async def call_many(self, calls: list, context: ExecutionContext, limit: int = None) -> list:
+		'''
+		Runs several external operator calls concurrently, each in its own branch of the context.
+		Every call is a tuple `(name, *args)` or `(name, kwargs_dict)`; results keep call order.
+
+		All call_many fan-outs of a context share one limiter of CALL_MANY_LIMIT running
+		calls; a call waiting for its own call_many gives its slot back meanwhile, so
+		nesting neither multiplies the limit nor deadlocks. `limit` further caps this
+		fan-out alone. The first failing call cancels its siblings and is raised.
+		'''
+		if context.limiter is None:
+			context.limiter = asyncio.Semaphore(CALL_MANY_LIMIT)
+		local = asyncio.Semaphore(limit) if limit else contextlib.nullcontext()
+
+		async def run(index, name, *args):
+			kwargs = {}
+			if len(args) == 1 and isinstance(args[0], dict):
+				kwargs = args[0]
+				args   = []
+
+			permit = _Permit(context.limiter)
+			_permit.set(permit)
+
+			async with local:
+				await permit.acquire()
+				try:
+					context.enter_branch(f'{name}[{index}]')
+					return await self.call_external_operator(
+						name     = name,
+						args     = list(args),
+						kwargs   = kwargs,
+						context  = context
+					)
+				finally:
+					permit.release()
+
+		parent = _permit.get()
+		if parent is not None:
+			parent.suspend()  # Waiting for children does not occupy a slot
+
+		try:
+			async with asyncio.TaskGroup() as group:
+				tasks = [group.create_task(run(index, *call)) for index, call in enumerate(calls)]
+		except ExceptionGroup as errors:
+			raise errors.exceptions[0]  # The failure that cancelled the rest
+		finally:
+			if parent is not None:
+				await parent.resume()
+
+		return [task.result() for task in tasks]
+
 	async def invoke(self, name: str, input: dict, context: ExecutionContext) -> dict:
 		if context is None:
 			raise ValueError('ExecutionContext must be explicitly provided')
 
-		self.i = context.i
-
 		registered_operators = await self.get_registered_operator_names()
 		type_classes         = await self.dapi.type_service.get_all(context)
-		operator_globals     = self.get_globals(context, type_classes)
+		operator_globals     = self.get_globals(context)
 		operator             = self.dapi.definition_service.require(name)
 		output               = ''
 
@@ -110,14 +217,17 @@ class RuntimeService(DapiService):
 				lineno      = 1,
 				restrict    = operator.restrict,
 				importance  = 1,
-				detail      = str(input)
+				detail      = input,
+				kind        = 'operator'
 			)
 			instance = Python(
 				execution_context      = context,
 				registered_operators   = registered_operators,
 				extra_globals          = operator_globals,
+				type_classes           = type_classes,
 				call_external_operator = self.call_external_operator,
-				restrict               = operator.restrict
+				restrict               = operator.restrict,
+				version                = self.dapi.definition_service.version
 			)
 
 			result = await instance.invoke(
@@ -133,7 +243,7 @@ class RuntimeService(DapiService):
 			raise DapiException.consume(e)
 
 		finally:
-			context.pop(detail=str(output))
+			context.pop(detail=output)
 
 	############################################################################
 
@@ -142,85 +252,8 @@ class RuntimeService(DapiService):
 		Builds and validates the input dictionary for an operator call
 		from positional args and keyword kwargs.
 		'''
-		operator        = self.dapi.definition_service.require(operator_name)
-		input_schema    = operator.input_type
-		expected_fields = list(input_schema.get('properties', {}).keys())
-		required_fields = input_schema.get('required', [])
-
-		# Utility to build detailed error context, phrased from operator's perspective
-		def make_detail(message: str, error_type: str, extra: dict = {}) -> dict:
-			return {
-				'message'    : message,
-				'error_type' : error_type,
-				'operator'   : operator_name,
-				'args'       : args,
-				'kwargs'     : kwargs,
-				'declared_input_fields': expected_fields,
-				**extra
-			}
-
-		provided = {}
-
-		# 1. Map positional args to declared fields in InputType
-		for param, value in zip(expected_fields, args):
-			provided[param] = value
-
-		# 2. Fill remaining fields from keyword args
-		for param in expected_fields:
-			if param not in provided and param in kwargs:
-				provided[param] = kwargs[param]
-
-		# 3. Auto-inject self if present in schema
-		if 'self' in expected_fields and 'self' not in provided:
-			provided['self'] = None
-
-		# 4. Fail if operator was defined with too few input fields
-		if len(args) > len(expected_fields):
-			raise DapiException(
-				status_code = 422,
-				detail      = make_detail(
-					message    = (
-						f'Operator `{operator_name}` declares only {len(expected_fields)} input field(s), '
-						f'but received {len(args)} positional argument(s): {args}'
-					),
-					error_type = 'TooManyArgs'
-				),
-				severity = DapiException.HALT
-			)
-
-		# 5. Fail if keyword arguments are passed that are not defined in operator's InputType
-		unexpected_keys = set(kwargs.keys()) - set(expected_fields)
-		if unexpected_keys:
-			raise DapiException(
-				status_code = 422,
-				detail      = make_detail(
-					message    = (
-						f'Operator `{operator_name}` received undeclared input fields: {", ".join(unexpected_keys)} '
-					),
-					error_type = 'UnexpectedKwargs'
-				),
-				severity = DapiException.HALT
-			)
-
-		# 6. Validate that all required parameters are present
-		parameters = {}
-		for param in expected_fields:
-			if param in provided:
-				parameters[param] = provided[param]
-			elif param in required_fields:
-				raise DapiException(
-					status_code = 422,
-					detail      = make_detail(
-						message    = (
-							f'Operator `{operator_name}` requires parameter `{param}` '
-							f'in its InputType, but received {list(provided.keys())}'
-						),
-						error_type = 'MissingRequired'
-					),
-					severity = DapiException.HALT
-				)
-
-		return parameters
+		operator = self.dapi.definition_service.require(operator_name)
+		return operator.binder.bind_input(args, kwargs)
 
 	############################################################################
 
@@ -229,64 +262,8 @@ class RuntimeService(DapiService):
 		Wraps a raw operator output (single value or tuple) into a validated dict
 		according to the operator's OutputType schema.
 		'''
-		operator        = self.dapi.definition_service.require(operator_name)
-		expected_fields = list(operator.output_type.get('properties', {}).keys())
-
-		# Utility to build detailed error context, phrased from operator's perspective
-		def make_detail(message: str, error_type: str) -> dict:
-			return {
-				'message'    : message,
-				'error_type' : error_type,
-				'operator'   : operator_name,
-				'expected'   : expected_fields,
-				'actual'     : output
-			}
-
-		# 1. Fail if operator does not define any output fields at all
-		if not expected_fields:
-			raise DapiException(
-				status_code = 500,
-				detail      = make_detail(
-					message    = f'Operator `{operator_name}` has no output fields defined in OutputType.',
-					error_type = 'MissingOutputFields'
-				),
-				severity = DapiException.HALT
-			)
-
-		# 2. Single-field output — value must be scalar (not tuple/dict)
-		if len(expected_fields) == 1:
-			return { expected_fields[0]: output }
-
-		# 3. Multi-field output — value must be tuple of correct length
-		if not isinstance(output, tuple):
-			raise DapiException(
-				status_code = 422,
-				detail      = make_detail(
-					message    = (
-						f'Operator `{operator_name}` must return a tuple with values for fields: '
-						f'{", ".join(expected_fields)} — got {type(output).__name__} ({type(output).__name__}) instead.'
-					),
-					error_type = 'InvalidOutputType'
-				),
-				severity = DapiException.HALT
-			)
-
-		# 4. Tuple length mismatch — output must match exactly
-		if len(output) != len(expected_fields):
-			raise DapiException(
-				status_code = 422,
-				detail      = make_detail(
-					message    = (
-						f'Operator `{operator_name}` returned tuple of length {len(output)}, '
-						f'but OutputType declares {len(expected_fields)} fields: {", ".join(expected_fields)}.'
-					),
-					error_type = 'OutputLengthMismatch'
-				),
-				severity = DapiException.HALT
-			)
-
-		# 5. Build named output dict from tuple
-		return { field: value for field, value in zip(expected_fields, output) }
+		operator = self.dapi.definition_service.require(operator_name)
+		return operator.binder.bind_output(output)
 
 	############################################################################
 
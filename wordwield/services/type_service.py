@@ -1,6 +1,6 @@
 from __future__    import annotations
 
-import json
+import ast, json
 from typing        import Any, Dict, List, Optional
 
 from wordwield.lib           import DapiService, DapiException, O, Python
@@ -21,38 +21,76 @@ class TypeService(DapiService):
 			'Dict'     : Dict
 		}
 
+	def __init__(self, dapi):
+		super().__init__(dapi)
+		self.registry = None  # name → (code, names referenced by code), loaded from db on first use
+		self.classes  = {}    # name → materialized class
+
 	async def initialize(self):
 		await super().initialize()
 
-	async def create(self, schema: TypeSchema):
-		if not schema.name:
-			raise DapiException.halt('Missing type name')
+	############################################################################
 
-		existing = self.dapi.db.get(TypeRecord, schema.name)
-		if existing:
-			self.dapi.db.delete(existing)
+	@staticmethod
+	def _get_references(code: str) -> set[str]:
+		'''Names referenced by type code: candidates for dependencies on other types.'''
+		return {
+			node.id
+			for node in ast.walk(ast.parse(code))
+			if isinstance(node, ast.Name)
+		}
 
-		self.dapi.db.add(TypeRecord(
-			name        = schema.name,
-			description = schema.description,
-			code        = schema.code,
-		))
-		self.dapi.db.commit()
+	def _get_registry(self) -> dict[str, tuple[str, set[str]]]:
+		if self.registry is None:
+			self.registry = {
+				name: (code, self._get_references(code))
+				for name, code in self.dapi.db.query(TypeRecord.name, TypeRecord.code).all()
+			}
+		return self.registry
+
+	def _get_dependents(self, name: str) -> set[str]:
+		'''Returns `name` with every type that depends on it, directly or transitively.'''
+		registry   = self._get_registry()
+		dependents = {name}
+		frontier   = [name]
+
+		while frontier:
+			current = frontier.pop()
+			for other, (_, references) in registry.items():
+				if current in references and other not in dependents:
+					dependents.add(other)
+					frontier.append(other)
+
+		return dependents
+
+	def _invalidate(self, name: str):
+		for dependent in self._get_dependents(name):
+			self.classes.pop(dependent, None)
+			self.dapi.odb.types.pop(dependent, None)
+		Python.clear_cache()
+
+	async def _materialize(self, name: str, context, visiting: list[str]):
+		'''Materializes dependencies of `name` first, so evaluation never misses a type.'''
+		if name in self.classes:
+			return
+
+		if name in visiting:
+			raise DapiException(
+				status_code = 422,
+				detail      = f'Circular type dependency: {" → ".join(visiting)} → {name}',
+				severity    = DapiException.HALT
+			)
 
-		return schema
+		registry = self._get_registry()
+		visiting.append(name)
+		for dependency in sorted(registry[name][1] & registry.keys() - {name}):
+			await self._materialize(dependency, context, visiting)
+		visiting.pop()
 
-	async def get(self, name, context) -> TypeSchema:
-		extra_globals = self.dapi.runtime_service.get_globals(context)
-		if name in self.dapi.odb.types:
-			return self.dapi.odb.types[name]
+		await self._eval(name, registry[name][0], context)
 
-		record = self.dapi.db.get(TypeRecord, name)
-		if not record:
-			raise DapiException(
-				status_code = 404,
-				detail      = f'Type `{name}` not found',
-				severity    = 'halt'
-			)
+	async def _eval(self, name: str, code: str, context):
+		extra_globals = self.dapi.runtime_service.get_globals(context, self.classes)
 		try:
 			context.push(
 				name        = name,
@@ -68,11 +106,12 @@ class TypeService(DapiService):
 				restrict               = True
 			)
 			loaded_type = await interpreter.eval_type(
-				code              = record.code,
-				class_name        = record.name,
+				code              = code,
+				class_name        = name,
 				get_external_type = self.get,
 				context           = context
 			)
+			self.classes[name]        = loaded_type
 			self.dapi.odb.types[name] = loaded_type
 			return loaded_type
 		except Exception as e:
@@ -80,11 +119,50 @@ class TypeService(DapiService):
 		finally:
 			context.pop()
 
+	############################################################################
+
+	async def create(self, schema: TypeSchema):
+		if not schema.name:
+			raise DapiException.halt('Missing type name')
+
+		references = self._get_references(schema.code)
+
+		existing = self.dapi.db.get(TypeRecord, schema.name)
+		if existing:
+			self.dapi.db.delete(existing)
+
+		self.dapi.db.add(TypeRecord(
+			name        = schema.name,
+			description = schema.description,
+			code        = schema.code,
+		))
+		self.dapi.db.commit()
+
+		self._invalidate(schema.name)
+		self._get_registry()[schema.name] = (schema.code, references)
+
+		return schema
+
+	async def get(self, name, context) -> TypeSchema:
+		if name in self.classes:
+			return self.classes[name]
+
+		if name not in self._get_registry():
+			raise DapiException(
+				status_code = 404,
+				detail      = f'Type `{name}` not found',
+				severity    = 'halt'
+			)
+
+		await self._materialize(name, context, [])
+		return self.classes[name]
+
 	async def get_all(self, context) -> list[TypeSchema]:
-		classes = {}
-		for (name,) in self.dapi.db.query(TypeRecord.name).all():
-			classes[name] = await self.get(name, context)
-		return classes		
+		registry = self._get_registry()
+		if len(self.classes) < len(registry):
+			for name in registry:
+				await self.get(name, context)
+		return self.classes
 
 	async def delete(self, name: str):
 		record = self.dapi.db.get(TypeRecord, name)
@@ -92,6 +170,15 @@ class TypeService(DapiService):
 			self.dapi.db.delete(record)
 			self.dapi.db.commit()
 
+		self._invalidate(name)
+		self._get_registry().pop(name, None)
+
 	async def delete_all(self):
 		self.dapi.db.query(TypeRecord).delete()
 		self.dapi.db.commit()
+
+		for name in list(self.classes):
+			self.dapi.odb.types.pop(name, None)
+		self.classes.clear()
+		self.registry = None
+		Python.clear_cache()